@@ -7,7 +7,7 @@ import os
 import json
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterator
 import time
 
 from letta_client import Letta
@@ -171,11 +171,15 @@ Remember to:
     
     def send_message(self, message: str) -> Dict[str, Any]:
         """Send a message to the agent and get response"""
+        return self.send_batch([message])
+    
+    def send_batch(self, messages: List[str]) -> Dict[str, Any]:
+        """Send several user messages to the agent in one request and get its response"""
         try:
             if not self.agent_id:
                 raise ValueError("Agent not initialized")
             
-            # Send message to agent
+            # Send messages to agent
             response = self.client.agents.messages.create(
                 agent_id=self.agent_id,
                 messages=[
@@ -183,14 +187,16 @@ Remember to:
                         "role": "user",
                         "content": message
                     }
+                    for message in messages
                 ]
             )
             
-            # Process response
+            # Process response into plain types so any serializer (JSON, msgpack) can encode it
+            usage = getattr(response, 'usage', None)
             result = {
                 'messages': [],
                 'tool_calls': [],
-                'usage': response.usage if hasattr(response, 'usage') else {}
+                'usage': usage.model_dump() if hasattr(usage, 'model_dump') else (usage or {})
             }
             
             for msg in response.messages:
@@ -198,7 +204,7 @@ Remember to:
                     result['messages'].append({
                         'role': 'assistant',
                         'content': msg.content,
-                        'timestamp': msg.date
+                        'timestamp': msg.date.isoformat() if msg.date else None
                     })
                 elif msg.message_type == 'tool_call':
                     result['tool_calls'].append({
@@ -209,7 +215,7 @@ Remember to:
             
             # Store in conversation history
             self.conversation_history.append({
-                'user_message': message,
+                'user_message': "\n".join(messages),
                 'agent_response': result,
                 'timestamp': datetime.now().isoformat()
             })
@@ -220,6 +226,48 @@ Remember to:
             logger.error(f"Error sending message to agent: {e}")
             raise
     
+    def stream_message(self, message: str) -> Iterator[str]:
+        """Send a message to the agent and yield its reply as tokens arrive"""
+        if not self.agent_id:
+            raise ValueError("Agent not initialized")
+        
+        try:
+            stream = self.client.agents.messages.create_stream(
+                agent_id=self.agent_id,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": message
+                    }
+                ],
+                stream_tokens=True
+            )
+            
+            tokens = []
+            for chunk in stream:
+                if getattr(chunk, 'message_type', None) == 'assistant_message' and chunk.content:
+                    tokens.append(chunk.content)
+                    yield chunk.content
+            
+            # Store the assembled reply in conversation history
+            self.conversation_history.append({
+                'user_message': message,
+                'agent_response': {
+                    'messages': [{
+                        'role': 'assistant',
+                        'content': "".join(tokens),
+                        'timestamp': datetime.now().isoformat()
+                    }],
+                    'tool_calls': [],
+                    'usage': {}
+                },
+                'timestamp': datetime.now().isoformat()
+            })
+            
+        except Exception as e:
+            logger.error(f"Error streaming message to agent: {e}")
+            raise
+    
     def get_agent_status(self) -> Dict[str, Any]:
         """Get current agent status"""
         try:
@@ -14,7 +14,6 @@ import pickle
 import sqlite3
 from sentence_transformers import SentenceTransformer
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 import PyPDF2
 import docx
 from PIL import Image
@@ -22,6 +21,14 @@ import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+def _cosine_scores(query_vector: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """Cosine similarity of a query vector against each row of a matrix"""
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query_vector)
+    dots = matrix @ query_vector
+    
+    # Zero vectors score 0, matching sklearn's cosine_similarity
+    return np.divide(dots, norms, out=np.zeros_like(dots), where=norms != 0)
+
 class KnowledgeManager:
     """Manages knowledge base operations including documents, notes, and search"""
     
@@ -52,11 +59,22 @@ class KnowledgeManager:
                     content TEXT,
                     metadata TEXT,
                     embedding BLOB,
+                    content_hash TEXT,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
             
+            # Databases created before content hashing lack the column
+            columns = {row[1] for row in cursor.execute('PRAGMA table_info(documents)')}
+            if 'content_hash' not in columns:
+                cursor.execute('ALTER TABLE documents ADD COLUMN content_hash TEXT')
+            
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_documents_content_hash
+                ON documents(content_hash)
+            ''')
+            
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS notes (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -108,32 +126,26 @@ class KnowledgeManager:
             # Fallback to a simpler approach if model fails
             self.embeddings_model = None
     
-    def process_file(self, file_path: str, original_filename: str) -> Dict[str, Any]:
+    def process_file(self, file_path: str, original_filename: str,
+                     content_hash: Optional[str] = None) -> Dict[str, Any]:
         """Process uploaded file and extract content"""
         try:
             file_size = os.path.getsize(file_path)
             file_type = self._get_file_type(original_filename)
             
-            # Extract content based on file type
-            content = ""
-            metadata = {}
-            
-            if file_type == 'pdf':
-                content, metadata = self._extract_pdf_content(file_path)
-            elif file_type == 'docx':
-                content, metadata = self._extract_docx_content(file_path)
-            elif file_type == 'txt':
-                content, metadata = self._extract_text_content(file_path)
-            elif file_type == 'csv':
-                content, metadata = self._extract_csv_content(file_path)
-            elif file_type == 'excel':
-                content, metadata = self._extract_excel_content(file_path)
-            else:
-                content = f"Unsupported file type: {file_type}"
-                metadata = {'error': 'Unsupported file type'}
+            # Identical files reuse the stored content and embedding
+            existing = self._find_document_by_hash(content_hash, file_type) if content_hash else None
             
-            # Generate embedding
-            embedding = self._generate_embedding(content)
+            if existing:
+                content, metadata_json, embedding_blob = existing
+                metadata = json.loads(metadata_json) if metadata_json else {}
+            else:
+                content, metadata = self._extract_content(file_path, file_type)
+                
+                # Generate embedding
+                embedding = self._generate_embedding(content)
+                metadata_json = json.dumps(metadata)
+                embedding_blob = pickle.dumps(embedding) if embedding is not None else None
             
             # Store in database
             conn = sqlite3.connect(self.db_path)
@@ -141,16 +153,17 @@ class KnowledgeManager:
             
             cursor.execute('''
                 INSERT INTO documents 
-                (filename, original_filename, file_type, file_size, content, metadata, embedding)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+                (filename, original_filename, file_type, file_size, content, metadata, embedding, content_hash)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
                 os.path.basename(file_path),
                 original_filename,
                 file_type,
                 file_size,
                 content,
-                json.dumps(metadata),
-                pickle.dumps(embedding) if embedding is not None else None
+                metadata_json,
+                embedding_blob,
+                content_hash
             ))
             
             document_id = cursor.lastrowid
@@ -171,6 +184,35 @@ class KnowledgeManager:
             logger.error(f"Error processing file {original_filename}: {e}")
             raise
     
+    def _find_document_by_hash(self, content_hash: str, file_type: str) -> Optional[tuple]:
+        """Find stored content, metadata, and embedding for an identical earlier upload"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT content, metadata, embedding FROM documents
+                WHERE content_hash = ? AND file_type = ?
+                LIMIT 1
+            ''', (content_hash, file_type))
+            return cursor.fetchone()
+        finally:
+            conn.close()
+    
+    def _extract_content(self, file_path: str, file_type: str) -> tuple:
+        """Extract content and metadata based on file type"""
+        if file_type == 'pdf':
+            return self._extract_pdf_content(file_path)
+        elif file_type == 'docx':
+            return self._extract_docx_content(file_path)
+        elif file_type == 'txt':
+            return self._extract_text_content(file_path)
+        elif file_type == 'csv':
+            return self._extract_csv_content(file_path)
+        elif file_type == 'excel':
+            return self._extract_excel_content(file_path)
+        else:
+            return f"Unsupported file type: {file_type}", {'error': 'Unsupported file type'}
+    
     def _get_file_type(self, filename: str) -> str:
         """Determine file type from extension"""
         extension = os.path.splitext(filename)[1].lower()
@@ -492,23 +534,41 @@ class KnowledgeManager:
         try:
             cursor = conn.cursor()
             
-            # Get embeddings for existing results
-            for result in results:
-                if result['type'] == 'document':
-                    cursor.execute('SELECT embedding FROM documents WHERE id = ?', (result['id'],))
-                else:
-                    cursor.execute('SELECT embedding FROM notes WHERE id = ?', (result['id'],))
+            # Fetch embeddings for all results with one query per table
+            embeddings = {}
+            for result_type, table in (('document', 'documents'), ('note', 'notes')):
+                ids = [result['id'] for result in results if result['type'] == result_type]
+                if not ids:
+                    continue
                 
-                row = cursor.fetchone()
-                if row and row[0]:
+                placeholders = ','.join('?' * len(ids))
+                cursor.execute(f'SELECT id, embedding FROM {table} WHERE id IN ({placeholders})', ids)
+                for item_id, blob in cursor.fetchall():
+                    if not blob:
+                        continue
                     try:
-                        item_embedding = pickle.loads(row[0])
-                        # Calculate cosine similarity
-                        similarity = cosine_similarity([query_embedding], [item_embedding])[0][0]
-                        result['relevance_score'] = max(result['relevance_score'], similarity)
+                        embeddings[(result_type, item_id)] = np.asarray(pickle.loads(blob), dtype=np.float32)
                     except Exception as e:
                         logger.warning(f"Error calculating similarity: {e}")
             
+            # Score every result that has a compatible embedding in one matrix product
+            query_vector = np.asarray(query_embedding, dtype=np.float32)
+            scored = []
+            vectors = []
+            for result in results:
+                key = (result['type'], result['id'])
+                vector = embeddings.get(key)
+                if vector is not None and vector.shape == query_vector.shape:
+                    scored.append(result)
+                    vectors.append(vector)
+            
+            if not scored:
+                return results
+            
+            similarities = _cosine_scores(query_vector, np.vstack(vectors))
+            for result, similarity in zip(scored, similarities):
+                result['relevance_score'] = max(result['relevance_score'], float(similarity))
+            
             return results
             
         except Exception as e:
@@ -0,0 +1,51 @@
+"""
+Background tasks for the Letta web application
+Runs slow document processing outside the web process
+"""
+
+import os
+import logging
+
+import redis
+from celery import Celery
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+
+# Bumped whenever the knowledge base changes so cached searches go stale
+SEARCH_CACHE_VERSION_KEY = 'search:version'
+
+celery_app = Celery('letta', broker=REDIS_URL, backend=REDIS_URL)
+celery_app.conf.update(
+    task_track_started=True,
+    worker_prefetch_multiplier=1,  # Uploads are long-running; don't hoard them
+    result_expires=3600
+)
+
+_knowledge_manager = None
+
+def get_knowledge_manager():
+    """Create the worker's knowledge manager on first use"""
+    global _knowledge_manager
+    if _knowledge_manager is None:
+        from knowledge_manager import KnowledgeManager
+        _knowledge_manager = KnowledgeManager()
+    return _knowledge_manager
+
+@celery_app.task(name='letta.process_upload')
+def process_upload(file_path: str, filename: str, content_hash: str = None):
+    """Extract, embed, and store an uploaded file"""
+    logger.info(f"Processing upload {filename}")
+    result = get_knowledge_manager().process_file(file_path, filename, content_hash)
+    
+    try:
+        redis.from_url(REDIS_URL).incr(SEARCH_CACHE_VERSION_KEY)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate search cache: {e}")
+    
+    return result
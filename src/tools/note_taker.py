@@ -5,13 +5,33 @@ Handles note creation, organization, and retrieval
 
 import os
 import json
+import time
+import asyncio
 import logging
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import sqlite3
 
 logger = logging.getLogger(__name__)
 
+# Bump when adding a migration step to initialize_database
+NOTES_SCHEMA_VERSION = 1
+
+# Search result cache settings
+SEARCH_CACHE_SIZE = 256
+SEARCH_CACHE_TTL = 30  # seconds
+
+SNIPPET_LENGTH = 200
+_ELLIPSIS = "..."
+
+
+def _snippet(text: str, length: int = SNIPPET_LENGTH) -> str:
+    """Truncate note content to a preview snippet"""
+    return text if len(text) <= length else text[:length] + _ELLIPSIS
+
+
 class NoteTakerTool:
     """Tool for managing notes and quick captures"""
     
@@ -21,39 +41,52 @@ class NoteTakerTool:
         self.db_path = "./data/notes.db"
         self.data_dir = "./data"
         
+        # LRU cache of recent search results, invalidated on every write
+        self._search_cache = OrderedDict()
+        self._search_cache_version = 0
+        self._search_cache_lock = threading.Lock()
+        
         # Ensure directories exist
         os.makedirs(self.data_dir, exist_ok=True)
         self.initialize_database()
     
     def initialize_database(self):
-        """Initialize the notes database"""
+        """Initialize the notes database, migrating the schema on first use"""
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS notes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    content TEXT NOT NULL,
-                    tags TEXT DEFAULT '[]',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    priority INTEGER DEFAULT 0,
-                    archived BOOLEAN DEFAULT FALSE
-                )
-            ''')
+            # Already migrated databases skip straight past schema creation
+            version = cursor.execute('PRAGMA user_version').fetchone()[0]
             
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS note_tags (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT UNIQUE NOT NULL,
-                    count INTEGER DEFAULT 0,
-                    color TEXT DEFAULT '#007bff'
-                )
-            ''')
+            if version < 1:
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS notes (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        title TEXT NOT NULL,
+                        content TEXT NOT NULL,
+                        tags TEXT DEFAULT '[]',
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        priority INTEGER DEFAULT 0,
+                        archived BOOLEAN DEFAULT FALSE
+                    )
+                ''')
+                
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS note_tags (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        name TEXT UNIQUE NOT NULL,
+                        count INTEGER DEFAULT 0,
+                        color TEXT DEFAULT '#007bff'
+                    )
+                ''')
+                
+                cursor.execute('ANALYZE')
+                cursor.execute(f'PRAGMA user_version = {NOTES_SCHEMA_VERSION}')
+                
+                conn.commit()
             
-            conn.commit()
             conn.close()
             
         except Exception as e:
@@ -131,6 +164,14 @@ class NoteTakerTool:
             logger.error(f"Error in note taker: {e}")
             return {"error": str(e)}
     
+    async def execute_async(self, action: str, title: str = None, content: str = None,
+                            tags: str = None, note_id: int = None, query: str = None,
+                            priority: int = 0, limit: int = 20) -> Dict[str, Any]:
+        """Execute note management action without blocking the event loop"""
+        return await asyncio.to_thread(
+            self.execute, action, title, content, tags, note_id, query, priority, limit
+        )
+    
     def _create_note(self, title: str, content: str, tags: str = None, priority: int = 0) -> Dict[str, Any]:
         """Create a new note"""
         try:
@@ -158,6 +199,7 @@ class NoteTakerTool:
                 ''', (tag, tag))
             
             conn.commit()
+            self._invalidate_search_cache()
             conn.close()
             
             return {
@@ -192,7 +234,7 @@ class NoteTakerTool:
                 notes.append({
                     "id": row[0],
                     "title": row[1],
-                    "content": row[2][:200] + "..." if len(row[2]) > 200 else row[2],
+                    "content": _snippet(row[2]),
                     "tags": json.loads(row[3]),
                     "created_at": row[4],
                     "updated_at": row[5],
@@ -217,6 +259,11 @@ class NoteTakerTool:
             if not query:
                 return {"error": "Search query is required"}
             
+            cache_key = (query, limit, self._search_cache_version)
+            cached = self._get_cached_search(cache_key)
+            if cached is not None:
+                return {**cached, "query": query}
+            
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
@@ -234,7 +281,7 @@ class NoteTakerTool:
                 notes.append({
                     "id": row[0],
                     "title": row[1],
-                    "content": row[2][:200] + "..." if len(row[2]) > 200 else row[2],
+                    "content": _snippet(row[2]),
                     "tags": json.loads(row[3]),
                     "created_at": row[4],
                     "updated_at": row[5],
@@ -244,12 +291,15 @@ class NoteTakerTool:
             
             conn.close()
             
-            return {
+            result = {
                 "success": True,
                 "query": query,
                 "count": len(notes),
                 "notes": notes
             }
+            self._save_search_to_cache(cache_key, result)
+            
+            return result
             
         except Exception as e:
             return {"error": f"Failed to search notes: {str(e)}"}
@@ -264,35 +314,36 @@ class NoteTakerTool:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
-            # Get current note
-            cursor.execute('SELECT title, content, tags, priority FROM notes WHERE id = ?', (note_id,))
+            # Fields left unset keep their current value
+            cursor.execute('''
+                UPDATE notes
+                SET title = COALESCE(?, title),
+                    content = COALESCE(?, content),
+                    tags = COALESCE(?, tags),
+                    priority = COALESCE(?, priority),
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+                RETURNING title, content, tags, priority
+            ''', (title or None, content or None,
+                  json.dumps(self._parse_tags(tags)) if tags else None,
+                  priority, note_id))
             row = cursor.fetchone()
             
             if not row:
+                conn.close()
                 return {"error": f"Note with ID {note_id} not found"}
             
-            # Update fields
-            new_title = title if title else row[0]
-            new_content = content if content else row[1]
-            new_tags = json.dumps(self._parse_tags(tags)) if tags else row[2]
-            new_priority = priority if priority is not None else row[3]
-            
-            cursor.execute('''
-                UPDATE notes
-                SET title = ?, content = ?, tags = ?, priority = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (new_title, new_content, new_tags, new_priority, note_id))
-            
             conn.commit()
+            self._invalidate_search_cache()
             conn.close()
             
             return {
                 "success": True,
                 "note_id": note_id,
-                "title": new_title,
-                "content": new_content,
-                "tags": json.loads(new_tags),
-                "priority": new_priority,
+                "title": row[0],
+                "content": row[1],
+                "tags": json.loads(row[2]),
+                "priority": row[3],
                 "message": f"Note updated successfully"
             }
             
@@ -329,6 +380,7 @@ class NoteTakerTool:
                 cursor.execute('DELETE FROM note_tags WHERE name = ? AND count <= 0', (tag,))
             
             conn.commit()
+            self._invalidate_search_cache()
             conn.close()
             
             return {
@@ -395,6 +447,7 @@ class NoteTakerTool:
                 return {"error": f"Note with ID {note_id} not found"}
             
             conn.commit()
+            self._invalidate_search_cache()
             conn.close()
             
             status = "archived" if row[0] else "unarchived"
@@ -409,6 +462,38 @@ class NoteTakerTool:
         except Exception as e:
             return {"error": f"Failed to archive note: {str(e)}"}
     
+    def _get_cached_search(self, cache_key: tuple) -> Optional[Dict[str, Any]]:
+        """Return a cached search result if present and not expired"""
+        with self._search_cache_lock:
+            entry = self._search_cache.get(cache_key)
+            if entry is None:
+                return None
+            
+            cached_at, result = entry
+            if time.monotonic() - cached_at > SEARCH_CACHE_TTL:
+                del self._search_cache[cache_key]
+                return None
+            
+            self._search_cache.move_to_end(cache_key)
+            return result
+    
+    def _save_search_to_cache(self, cache_key: tuple, result: Dict[str, Any]):
+        """Store a search result, evicting the least recently used entry"""
+        with self._search_cache_lock:
+            if cache_key[-1] != self._search_cache_version:
+                return  # A write landed while this search was running
+            
+            self._search_cache[cache_key] = (time.monotonic(), result)
+            self._search_cache.move_to_end(cache_key)
+            if len(self._search_cache) > SEARCH_CACHE_SIZE:
+                self._search_cache.popitem(last=False)
+    
+    def _invalidate_search_cache(self):
+        """Invalidate cached search results after a write"""
+        with self._search_cache_lock:
+            self._search_cache_version += 1
+            self._search_cache.clear()
+    
     def _parse_tags(self, tags_str: str) -> List[str]:
         """Parse comma-separated tags string"""
         if not tags_str:
@@ -4,23 +4,311 @@ Handles todo items, projects, task tracking, and productivity
 """
 
 import os
+import re
 import json
+import time
 import logging
+import threading
+import inspect
+from functools import lru_cache, wraps
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 import sqlite3
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+if orjson is not None:
+    def _json_dumps(value: Any) -> str:
+        return orjson.dumps(value).decode()
+    
+    _json_loads = orjson.loads
+else:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
+# Splits a comma-separated tag string, swallowing whitespace around commas
+_TAG_SPLIT = re.compile(r'\s*,\s*')
+
+# Seconds a generated report may be served from cache while tasks are unchanged
+REPORT_CACHE_TTL = 5
+
+# Size of each connection's prepared statement cache
+STATEMENT_CACHE_SIZE = 256
+
+SQL_CREATE_TIME_LOGS = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER NOT NULL,
+        start_time TEXT NOT NULL,
+        end_time TEXT,
+        duration_minutes INTEGER,
+        description TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (task_id) REFERENCES tasks (id) ON DELETE CASCADE
+    )
+'''
+
+# SQL for the hot action paths, kept as constants so identical text hits
+# the connection's prepared statement cache. List and search share the
+# same column list.
+SQL_TASK_COLUMNS = '''
+    SELECT t.id, t.title, t.description, t.project_id, p.name as project_name,
+           t.priority, t.status,
+           (SELECT json_group_array(tag) FROM task_tags WHERE task_id = t.id) as tags,
+           t.due_date, t.created_at, 
+           t.estimated_hours, t.actual_hours
+'''
+
+SQL_SELECT_TASKS = SQL_TASK_COLUMNS + '''
+    FROM tasks t
+    LEFT JOIN projects p ON t.project_id = p.id
+'''
+
+SQL_LIST_TASKS_BY_STATUS = SQL_SELECT_TASKS + '''
+    WHERE t.status = ?
+    ORDER BY t.priority DESC, t.created_at DESC
+    LIMIT ?
+'''
+
+SQL_LIST_OPEN_TASKS = SQL_SELECT_TASKS + '''
+    WHERE t.status != 'completed'
+    ORDER BY t.priority DESC, t.created_at DESC
+    LIMIT ?
+'''
+
+SQL_SEARCH_TASKS = SQL_TASK_COLUMNS + '''
+    FROM tasks_fts f
+    JOIN tasks t ON t.id = f.rowid
+    LEFT JOIN projects p ON t.project_id = p.id
+    WHERE tasks_fts MATCH ?
+    ORDER BY bm25(tasks_fts)
+    LIMIT ?
+'''
+
+SQL_INSERT_TASK = '''
+    INSERT INTO tasks (title, description, project_id, priority, tags, 
+                       due_date, estimated_hours)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+# executemany cannot use RETURNING, so single inserts get their own variant
+SQL_INSERT_TASK_RETURNING_ID = SQL_INSERT_TASK + 'RETURNING id'
+
+# NULL parameters keep the column's current value
+SQL_UPDATE_TASK = '''
+    UPDATE tasks
+    SET title = COALESCE(?, title), description = COALESCE(?, description),
+        project_id = COALESCE(?, project_id), priority = COALESCE(?, priority),
+        status = COALESCE(?, status), tags = COALESCE(?, tags),
+        due_date = COALESCE(?, due_date), estimated_hours = COALESCE(?, estimated_hours),
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+    RETURNING title, status, priority
+'''
+
+SQL_SELECT_TASK_STATUS = 'SELECT title, status FROM tasks WHERE id = ?'
+SQL_INSERT_TASK_TAG = 'INSERT OR IGNORE INTO task_tags (task_id, tag) VALUES (?, ?)'
+SQL_INSERT_TASK_TAGS_FROM_JSON = '''
+    INSERT OR IGNORE INTO task_tags (task_id, tag)
+    SELECT t.id, j.value FROM tasks t, json_each(t.tags) j
+    WHERE t.id BETWEEN ? AND ?
+'''
+SQL_DELETE_TASK_TAGS = 'DELETE FROM task_tags WHERE task_id = ?'
+SQL_DELETE_TASK = 'DELETE FROM tasks WHERE id = ? RETURNING title'
+
+SQL_COMPLETE_TASK = '''
+    UPDATE tasks
+    SET status = 'completed', completed_at = CURRENT_TIMESTAMP,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+'''
+
+SQL_INSERT_TIME_LOG = '''
+    INSERT INTO time_logs (task_id, start_time, duration_minutes, description)
+    VALUES (?, ?, ?, ?)
+'''
+
+SQL_ADD_ACTUAL_HOURS = '''
+    UPDATE tasks SET actual_hours = COALESCE(actual_hours, 0) + ?
+    WHERE id = ?
+    RETURNING title, actual_hours
+'''
+
+SQL_REPORT_AGGREGATES = '''
+    SELECT status, priority, COUNT(*), SUM(due_date < ?),
+           SUM(actual_hours), SUM(estimated_hours)
+    FROM tasks
+    GROUP BY status, priority
+'''
+
+SQL_RECENT_COMPLETIONS = '''
+    SELECT title, completed_at
+    FROM tasks
+    WHERE status = 'completed'
+    ORDER BY completed_at DESC
+    LIMIT 5
+'''
+
+SQL_INSERT_PROJECT = '''
+    INSERT INTO projects (name, description)
+    VALUES (?, ?)
+'''
+
+SQL_LIST_PROJECTS = '''
+    SELECT id, name, description, status, created_at,
+           (SELECT COUNT(*) FROM tasks WHERE project_id = p.id) as task_count
+    FROM projects p
+    ORDER BY created_at DESC
+'''
+
+@lru_cache(maxsize=None)
+def _handler_params(func) -> tuple:
+    """Names of the parameters an action handler accepts, excluding self"""
+    return tuple(inspect.signature(func).parameters)[1:]
+
+
+def _safe(action: str):
+    """Turn exceptions raised by an action handler into an error dict"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return func(self, *args, **kwargs)
+            except Exception as e:
+                logger.exception(f"Failed to {action}: {e}")
+                return {"error": f"Failed to {action}: {str(e)}"}
+        return wrapper
+    return decorator
+
+
+TASK_STATUSES = ("pending", "in_progress", "completed", "blocked", "cancelled")
+_VALID_STATUS = frozenset(TASK_STATUSES)
+
+TOOL_NAME = "task_manager"
+TOOL_DESCRIPTION = "Manage tasks, todo items, projects, and track productivity"
+
+# Built once at import; callers share this dict and must not mutate it
+FUNCTION_SCHEMA = {
+    "name": TOOL_NAME,
+    "description": TOOL_DESCRIPTION,
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "action": {
+                "type": "string",
+                "enum": ["create", "create_many", "list", "search", "update", "delete", "complete", "project", "track", "report"],
+                "description": "Action to perform on tasks"
+            },
+            "title": {
+                "type": "string",
+                "description": "Title of the task"
+            },
+            "description": {
+                "type": "string",
+                "description": "Description of the task"
+            },
+            "project_name": {
+                "type": "string",
+                "description": "Name of the project"
+            },
+            "project_id": {
+                "type": "integer",
+                "description": "ID of the project"
+            },
+            "task_id": {
+                "type": "integer",
+                "description": "ID of the task to operate on"
+            },
+            "priority": {
+                "type": "integer",
+                "description": "Priority level (0-5, higher is more important)"
+            },
+            "status": {
+                "type": "string",
+                "enum": list(TASK_STATUSES),
+                "description": "Status of the task"
+            },
+            "tags": {
+                "type": "string",
+                "description": "Comma-separated tags for the task"
+            },
+            "due_date": {
+                "type": "string",
+                "description": "Due date in ISO format (YYYY-MM-DD)"
+            },
+            "query": {
+                "type": "string",
+                "description": "Search query for finding tasks"
+            },
+            "estimated_hours": {
+                "type": "number",
+                "description": "Estimated hours to complete the task"
+            },
+            "hours": {
+                "type": "number",
+                "description": "Hours to log for time tracking"
+            },
+            "limit": {
+                "type": "integer",
+                "description": "Maximum number of results to return"
+            },
+            "tasks": {
+                "type": "array",
+                "description": "Tasks to create in one batch (create_many)",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "title": {"type": "string"},
+                        "description": {"type": "string"},
+                        "project_id": {"type": "integer"},
+                        "priority": {"type": "integer"},
+                        "tags": {"type": "string"},
+                        "due_date": {"type": "string"},
+                        "estimated_hours": {"type": "number"}
+                    },
+                    "required": ["title"]
+                }
+            }
+        },
+        "required": ["action"]
+    }
+}
+
 class TaskManagerTool:
     """Tool for managing tasks, todos, and projects"""
     
     def __init__(self):
-        self.name = "task_manager"
-        self.description = "Manage tasks, todo items, projects, and track productivity"
+        self.name = TOOL_NAME
+        self.description = TOOL_DESCRIPTION
         self.db_path = "./data/tasks.db"
         self.data_dir = "./data"
         
+        # Action name -> handler; parameter names must match execute's
+        self._actions = {
+            "create": self._create_task,
+            "create_many": self._create_tasks,
+            "list": self._list_tasks,
+            "search": self._search_tasks,
+            "update": self._update_task,
+            "delete": self._delete_task,
+            "complete": self._complete_task,
+            "project": self._manage_project,
+            "track": self._track_time,
+            "report": self._generate_report,
+        }
+        
+        # (version, generated_at, payload) of the last report; writes bump _report_version
+        self._report_cache = None
+        self._report_version = 0
+        
+        # One long-lived connection per thread, created lazily by _get_conn
+        self._pool = threading.local()
+        
         # Ensure directories exist
         os.makedirs(self.data_dir, exist_ok=True)
         self.initialize_database()
@@ -28,623 +316,547 @@ class TaskManagerTool:
     def initialize_database(self):
         """Initialize the tasks database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            conn = self._get_conn()
             
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS projects (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    description TEXT,
-                    status TEXT DEFAULT 'active',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    completed_at TIMESTAMP,
-                    deadline TEXT
-                )
-            ''')
+            # WAL is persistent, so later connections inherit the journal mode
+            conn.execute('PRAGMA journal_mode=WAL')
             
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS tasks (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    project_id INTEGER,
-                    priority INTEGER DEFAULT 0,
-                    status TEXT DEFAULT 'pending',
-                    tags TEXT DEFAULT '[]',
-                    due_date TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    completed_at TIMESTAMP,
-                    estimated_hours REAL DEFAULT 0,
-                    actual_hours REAL DEFAULT 0,
-                    FOREIGN KEY (project_id) REFERENCES projects (id)
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS time_logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    task_id INTEGER NOT NULL,
-                    start_time TEXT NOT NULL,
-                    end_time TEXT,
-                    duration_minutes INTEGER,
-                    description TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (task_id) REFERENCES tasks (id)
-                )
-            ''')
-            
-            conn.commit()
-            conn.close()
+            with conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS projects (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        name TEXT NOT NULL,
+                        description TEXT,
+                        status TEXT DEFAULT 'active',
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        completed_at TIMESTAMP,
+                        deadline TEXT
+                    )
+                ''')
+                
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS tasks (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        title TEXT NOT NULL,
+                        description TEXT,
+                        project_id INTEGER,
+                        priority INTEGER DEFAULT 0,
+                        status TEXT DEFAULT 'pending',
+                        tags TEXT DEFAULT '[]',
+                        due_date TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        completed_at TIMESTAMP,
+                        estimated_hours REAL DEFAULT 0,
+                        actual_hours REAL DEFAULT 0,
+                        FOREIGN KEY (project_id) REFERENCES projects (id)
+                    )
+                ''')
+                
+                cursor.execute(SQL_CREATE_TIME_LOGS.format(table='time_logs'))
+                
+                # Older databases lack the cascade; rebuild time_logs to add it
+                cursor.execute('PRAGMA foreign_key_list(time_logs)')
+                if any(fk[2] == 'tasks' and fk[6] != 'CASCADE' for fk in cursor.fetchall()):
+                    cursor.execute(SQL_CREATE_TIME_LOGS.format(table='time_logs_new'))
+                    cursor.execute('INSERT INTO time_logs_new SELECT * FROM time_logs')
+                    cursor.execute('DROP TABLE time_logs')
+                    cursor.execute('ALTER TABLE time_logs_new RENAME TO time_logs')
+                
+                # Normalized tags; tasks.tags keeps a JSON copy as the FTS source
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'task_tags'")
+                task_tags_exist = cursor.fetchone() is not None
+                
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS task_tags (
+                        task_id INTEGER NOT NULL,
+                        tag TEXT NOT NULL,
+                        PRIMARY KEY (task_id, tag),
+                        FOREIGN KEY (task_id) REFERENCES tasks (id) ON DELETE CASCADE
+                    ) WITHOUT ROWID
+                ''')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_task_tags_tag ON task_tags (tag)')
+                
+                if not task_tags_exist:
+                    # Backfill from the JSON tags of existing tasks
+                    cursor.execute('''
+                        INSERT OR IGNORE INTO task_tags (task_id, tag)
+                        SELECT t.id, j.value FROM tasks t, json_each(t.tags) j
+                        WHERE json_valid(t.tags)
+                    ''')
+                
+                # Full-text index over tasks, kept in sync by triggers
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts'")
+                fts_exists = cursor.fetchone() is not None
+                
+                cursor.execute('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+                        title, description, tags,
+                        content='tasks', content_rowid='id', tokenize='unicode61'
+                    )
+                ''')
+                
+                cursor.execute('''
+                    CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+                        INSERT INTO tasks_fts (rowid, title, description, tags)
+                        VALUES (new.id, new.title, new.description, new.tags);
+                    END
+                ''')
+                
+                cursor.execute('''
+                    CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+                        INSERT INTO tasks_fts (tasks_fts, rowid, title, description, tags)
+                        VALUES ('delete', old.id, old.title, old.description, old.tags);
+                    END
+                ''')
+                
+                cursor.execute('''
+                    CREATE TRIGGER IF NOT EXISTS tasks_fts_update
+                    AFTER UPDATE OF title, description, tags ON tasks BEGIN
+                        INSERT INTO tasks_fts (tasks_fts, rowid, title, description, tags)
+                        VALUES ('delete', old.id, old.title, old.description, old.tags);
+                        INSERT INTO tasks_fts (rowid, title, description, tags)
+                        VALUES (new.id, new.title, new.description, new.tags);
+                    END
+                ''')
+                
+                if not fts_exists:
+                    # Index tasks created before the FTS table existed
+                    cursor.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+                
+                # Indexes covering the list ordering, report filters, and joins
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_tasks_status_prio_created'")
+                indexes_exist = cursor.fetchone() is not None
+                
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_tasks_status_prio_created
+                    ON tasks (status, priority DESC, created_at DESC)
+                ''')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_due_status ON tasks (due_date, status)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_project ON tasks (project_id)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_timelogs_task ON time_logs (task_id)')
+                
+                # Partial index over the active slice, read in order by the open-task list
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_tasks_open_prio_created
+                    ON tasks (priority DESC, created_at DESC) WHERE status != 'completed'
+                ''')
+                
+                if not indexes_exist:
+                    # Gather statistics once so the planner picks up the new indexes
+                    cursor.execute('ANALYZE')
             
         except Exception as e:
             logger.error(f"Failed to initialize tasks database: {e}")
     
+    def _get_conn(self) -> sqlite3.Connection:
+        """Get this thread's pooled database connection, creating it on first use"""
+        conn = getattr(self._pool, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                                   cached_statements=STATEMENT_CACHE_SIZE)
+            
+            # Per-connection settings, applied once for the connection's lifetime
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=5000')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            conn.execute('PRAGMA cache_size=-20000')
+            conn.execute('PRAGMA foreign_keys=ON')
+            
+            conn.row_factory = sqlite3.Row
+            self._pool.conn = conn
+        return conn
+    
+    def _row_to_task(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a SQL_TASK_COLUMNS row into a task dict"""
+        task = dict(row)
+        task["tags"] = _json_loads(task["tags"]) if task["tags"] else []
+        return task
+    
     def get_function_schema(self) -> Dict[str, Any]:
         """Get the function schema for Letta"""
-        return {
-            "name": self.name,
-            "description": self.description,
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "action": {
-                        "type": "string",
-                        "enum": ["create", "list", "search", "update", "delete", "complete", "project", "track", "report"],
-                        "description": "Action to perform on tasks"
-                    },
-                    "title": {
-                        "type": "string",
-                        "description": "Title of the task"
-                    },
-                    "description": {
-                        "type": "string",
-                        "description": "Description of the task"
-                    },
-                    "project_name": {
-                        "type": "string",
-                        "description": "Name of the project"
-                    },
-                    "project_id": {
-                        "type": "integer",
-                        "description": "ID of the project"
-                    },
-                    "task_id": {
-                        "type": "integer",
-                        "description": "ID of the task to operate on"
-                    },
-                    "priority": {
-                        "type": "integer",
-                        "description": "Priority level (0-5, higher is more important)"
-                    },
-                    "status": {
-                        "type": "string",
-                        "enum": ["pending", "in_progress", "completed", "blocked", "cancelled"],
-                        "description": "Status of the task"
-                    },
-                    "tags": {
-                        "type": "string",
-                        "description": "Comma-separated tags for the task"
-                    },
-                    "due_date": {
-                        "type": "string",
-                        "description": "Due date in ISO format (YYYY-MM-DD)"
-                    },
-                    "query": {
-                        "type": "string",
-                        "description": "Search query for finding tasks"
-                    },
-                    "estimated_hours": {
-                        "type": "number",
-                        "description": "Estimated hours to complete the task"
-                    },
-                    "hours": {
-                        "type": "number",
-                        "description": "Hours to log for time tracking"
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "Maximum number of results to return"
-                    }
-                },
-                "required": ["action"]
-            }
-        }
+        return FUNCTION_SCHEMA
     
     def execute(self, action: str, title: str = None, description: str = None,
                 project_name: str = None, project_id: int = None, task_id: int = None,
-                priority: int = 0, status: str = "pending", tags: str = None,
+                priority: int = 0, status: str = None, tags: str = None,
                 due_date: str = None, query: str = None, estimated_hours: float = 0,
-                hours: float = None, limit: int = 20) -> Dict[str, Any]:
+                hours: float = None, limit: int = 20, tasks: List[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Execute task management action"""
         try:
-            if action == "create":
-                return self._create_task(title, description, project_id, priority, tags, due_date, estimated_hours)
-            elif action == "list":
-                return self._list_tasks(limit, status)
-            elif action == "search":
-                return self._search_tasks(query, limit)
-            elif action == "update":
-                return self._update_task(task_id, title, description, project_id, priority, status, tags, due_date, estimated_hours)
-            elif action == "delete":
-                return self._delete_task(task_id)
-            elif action == "complete":
-                return self._complete_task(task_id)
-            elif action == "project":
-                return self._manage_project(project_name, description)
-            elif action == "track":
-                return self._track_time(task_id, hours, description)
-            elif action == "report":
-                return self._generate_report()
-            else:
+            handler = self._actions.get(action)
+            if handler is None:
                 return {"error": f"Unknown action: {action}"}
+            
+            # Handlers name their parameters after execute's, so pass only those they accept
+            params = locals()
+            return handler(**{name: params[name] for name in _handler_params(handler.__func__)})
                 
         except Exception as e:
             logger.error(f"Error in task manager: {e}")
             return {"error": str(e)}
     
+    @_safe("create task")
     def _create_task(self, title: str, description: str, project_id: int, priority: int, 
                      tags: str, due_date: str, estimated_hours: float) -> Dict[str, Any]:
         """Create a new task"""
-        try:
-            if not title:
-                return {"error": "Task title is required"}
-            
-            # Parse tags
-            tag_list = self._parse_tags(tags) if tags else []
-            
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO tasks (title, description, project_id, priority, tags, 
-                                 due_date, estimated_hours)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (title, description, project_id, priority, json.dumps(tag_list), 
-                  due_date, estimated_hours))
-            
-            task_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
-            
-            return {
-                "success": True,
-                "task_id": task_id,
-                "title": title,
-                "description": description,
-                "priority": priority,
-                "tags": tag_list,
-                "due_date": due_date,
-                "estimated_hours": estimated_hours,
-                "message": f"Task '{title}' created successfully"
-            }
-            
-        except Exception as e:
-            return {"error": f"Failed to create task: {str(e)}"}
+        if not title:
+            return {"error": "Task title is required"}
+        
+        # Parse tags
+        tag_list = self._parse_tags(tags) if tags else []
+        
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        
+        with conn:
+            cursor.execute(SQL_INSERT_TASK_RETURNING_ID, (title, description, project_id, priority,
+                                                          _json_dumps(tag_list), due_date,
+                                                          estimated_hours))
+            task_id = cursor.fetchone()[0]
+            cursor.executemany(SQL_INSERT_TASK_TAG, [(task_id, tag) for tag in tag_list])
+        self._invalidate_report()
+        
+        return {
+            "success": True,
+            "task_id": task_id,
+            "title": title,
+            "description": description,
+            "priority": priority,
+            "tags": tag_list,
+            "due_date": due_date,
+            "estimated_hours": estimated_hours,
+            "message": f"Task '{title}' created successfully"
+        }
+    
+    @_safe("create tasks")
+    def _create_tasks(self, tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Create several tasks in a single transaction"""
+        if not tasks:
+            return {"error": "A list of tasks is required"}
+        
+        if any(not task.get("title") for task in tasks):
+            return {"error": "Every task requires a title"}
+        
+        rows = [
+            (task["title"], task.get("description"), task.get("project_id"),
+             task.get("priority", 0), _json_dumps(self._parse_tags(task.get("tags"))),
+             task.get("due_date"), task.get("estimated_hours", 0))
+            for task in tasks
+        ]
+        
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        
+        with conn:
+            cursor.executemany(SQL_INSERT_TASK, rows)
+            
+            # The write lock is held, so the batch received consecutive ids
+            last_id = cursor.execute('SELECT last_insert_rowid()').fetchone()[0]
+            first_id = last_id - len(rows) + 1
+            cursor.execute(SQL_INSERT_TASK_TAGS_FROM_JSON, (first_id, last_id))
+        self._invalidate_report()
+        
+        return {
+            "success": True,
+            "count": len(rows),
+            "task_ids": list(range(first_id, last_id + 1)),
+            "message": f"Created {len(rows)} tasks"
+        }
     
-    def _list_tasks(self, limit: int = 20, status_filter: str = None) -> Dict[str, Any]:
+    @_safe("list tasks")
+    def _list_tasks(self, limit: int = 20, status: str = None) -> Dict[str, Any]:
         """List tasks with optional status filter"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            if status_filter and status_filter != "pending":
-                cursor.execute('''
-                    SELECT t.id, t.title, t.description, t.project_id, p.name as project_name,
-                           t.priority, t.status, t.tags, t.due_date, t.created_at, 
-                           t.estimated_hours, t.actual_hours
-                    FROM tasks t
-                    LEFT JOIN projects p ON t.project_id = p.id
-                    WHERE t.status = ?
-                    ORDER BY t.priority DESC, t.created_at DESC
-                    LIMIT ?
-                ''', (status_filter, limit))
-            else:
-                cursor.execute('''
-                    SELECT t.id, t.title, t.description, t.project_id, p.name as project_name,
-                           t.priority, t.status, t.tags, t.due_date, t.created_at, 
-                           t.estimated_hours, t.actual_hours
-                    FROM tasks t
-                    LEFT JOIN projects p ON t.project_id = p.id
-                    WHERE t.status != 'completed'
-                    ORDER BY t.priority DESC, t.created_at DESC
-                    LIMIT ?
-                ''', (limit,))
-            
-            tasks = []
-            for row in cursor.fetchall():
-                tasks.append({
-                    "id": row[0],
-                    "title": row[1],
-                    "description": row[2],
-                    "project_id": row[3],
-                    "project_name": row[4],
-                    "priority": row[5],
-                    "status": row[6],
-                    "tags": json.loads(row[7]) if row[7] else [],
-                    "due_date": row[8],
-                    "created_at": row[9],
-                    "estimated_hours": row[10],
-                    "actual_hours": row[11]
-                })
-            
-            conn.close()
-            
-            return {
-                "success": True,
-                "count": len(tasks),
-                "status_filter": status_filter,
-                "tasks": tasks
-            }
-            
-        except Exception as e:
-            return {"error": f"Failed to list tasks: {str(e)}"}
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        
+        if status in _VALID_STATUS:
+            cursor.execute(SQL_LIST_TASKS_BY_STATUS, (status, limit))
+        else:
+            cursor.execute(SQL_LIST_OPEN_TASKS, (limit,))
+        
+        tasks = [self._row_to_task(row) for row in cursor.fetchall()]
+        
+        return {
+            "success": True,
+            "count": len(tasks),
+            "status_filter": status,
+            "tasks": tasks
+        }
     
+    @_safe("search tasks")
     def _search_tasks(self, query: str, limit: int = 20) -> Dict[str, Any]:
         """Search tasks by title, description, or tags"""
-        try:
-            if not query:
-                return {"error": "Search query is required"}
-            
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT t.id, t.title, t.description, t.project_id, p.name as project_name,
-                       t.priority, t.status, t.tags, t.due_date, t.created_at, 
-                       t.estimated_hours, t.actual_hours
-                FROM tasks t
-                LEFT JOIN projects p ON t.project_id = p.id
-                WHERE t.title LIKE ? OR t.description LIKE ? OR t.tags LIKE ?
-                ORDER BY t.priority DESC, t.created_at DESC
-                LIMIT ?
-            ''', (f'%{query}%', f'%{query}%', f'%{query}%', limit))
-            
-            tasks = []
-            for row in cursor.fetchall():
-                tasks.append({
-                    "id": row[0],
-                    "title": row[1],
-                    "description": row[2],
-                    "project_id": row[3],
-                    "project_name": row[4],
-                    "priority": row[5],
-                    "status": row[6],
-                    "tags": json.loads(row[7]) if row[7] else [],
-                    "due_date": row[8],
-                    "created_at": row[9],
-                    "estimated_hours": row[10],
-                    "actual_hours": row[11]
-                })
-            
-            conn.close()
-            
-            return {
-                "success": True,
-                "query": query,
-                "count": len(tasks),
-                "tasks": tasks
-            }
-            
-        except Exception as e:
-            return {"error": f"Failed to search tasks: {str(e)}"}
+        if not query or not query.strip():
+            return {"error": "Search query is required"}
+        
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        
+        cursor.execute(SQL_SEARCH_TASKS, (self._build_fts_query(query), limit))
+        
+        tasks = [self._row_to_task(row) for row in cursor.fetchall()]
+        
+        return {
+            "success": True,
+            "query": query,
+            "count": len(tasks),
+            "tasks": tasks
+        }
     
+    @_safe("update task")
     def _update_task(self, task_id: int, title: str = None, description: str = None,
                      project_id: int = None, priority: int = None, status: str = None,
                      tags: str = None, due_date: str = None, estimated_hours: float = None) -> Dict[str, Any]:
         """Update an existing task"""
-        try:
-            if not task_id:
-                return {"error": "Task ID is required"}
-            
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get current task
-            cursor.execute('''
-                SELECT title, description, project_id, priority, status, tags, 
-                       due_date, estimated_hours
-                FROM tasks WHERE id = ?
-            ''', (task_id,))
+        if not task_id:
+            return {"error": "Task ID is required"}
+        
+        if status and status not in _VALID_STATUS:
+            return {"error": f"Invalid status: {status}"}
+        
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        
+        tag_list = self._parse_tags(tags) if tags else None
+        new_tags = _json_dumps(tag_list) if tag_list is not None else None
+        
+        with conn:
+            cursor.execute(SQL_UPDATE_TASK, (title or None, description or None, project_id,
+                                             priority, status or None, new_tags, due_date or None,
+                                             estimated_hours, task_id))
             row = cursor.fetchone()
             
-            if not row:
-                return {"error": f"Task with ID {task_id} not found"}
-            
-            # Update fields
-            new_title = title if title else row[0]
-            new_description = description if description else row[1]
-            new_project_id = project_id if project_id is not None else row[2]
-            new_priority = priority if priority is not None else row[3]
-            new_status = status if status else row[4]
-            new_tags = json.dumps(self._parse_tags(tags)) if tags else row[5]
-            new_due_date = due_date if due_date else row[6]
-            new_estimated_hours = estimated_hours if estimated_hours is not None else row[7]
-            
-            cursor.execute('''
-                UPDATE tasks
-                SET title = ?, description = ?, project_id = ?, priority = ?, 
-                    status = ?, tags = ?, due_date = ?, estimated_hours = ?,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (new_title, new_description, new_project_id, new_priority,
-                  new_status, new_tags, new_due_date, new_estimated_hours, task_id))
-            
-            conn.commit()
-            conn.close()
-            
-            return {
-                "success": True,
-                "task_id": task_id,
-                "title": new_title,
-                "status": new_status,
-                "priority": new_priority,
-                "message": f"Task updated successfully"
-            }
-            
-        except Exception as e:
-            return {"error": f"Failed to update task: {str(e)}"}
+            if row and tag_list is not None:
+                cursor.execute(SQL_DELETE_TASK_TAGS, (task_id,))
+                cursor.executemany(SQL_INSERT_TASK_TAG, [(task_id, tag) for tag in tag_list])
+        self._invalidate_report()
+        
+        if not row:
+            return {"error": f"Task with ID {task_id} not found"}
+        
+        return {
+            "success": True,
+            "task_id": task_id,
+            "title": row[0],
+            "status": row[1],
+            "priority": row[2],
+            "message": f"Task updated successfully"
+        }
     
+    @_safe("delete task")
     def _delete_task(self, task_id: int) -> Dict[str, Any]:
         """Delete a task"""
-        try:
-            if not task_id:
-                return {"error": "Task ID is required"}
-            
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Check if task exists
-            cursor.execute('SELECT title FROM tasks WHERE id = ?', (task_id,))
+        if not task_id:
+            return {"error": "Task ID is required"}
+        
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        
+        # Time logs are removed by ON DELETE CASCADE
+        with conn:
+            cursor.execute(SQL_DELETE_TASK, (task_id,))
             row = cursor.fetchone()
-            
-            if not row:
-                return {"error": f"Task with ID {task_id} not found"}
-            
-            title = row[0]
-            
-            # Delete time logs first
-            cursor.execute('DELETE FROM time_logs WHERE task_id = ?', (task_id,))
-            
-            # Delete the task
-            cursor.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
-            
-            conn.commit()
-            conn.close()
-            
-            return {
-                "success": True,
-                "task_id": task_id,
-                "title": title,
-                "message": f"Task '{title}' deleted successfully"
-            }
-            
-        except Exception as e:
-            return {"error": f"Failed to delete task: {str(e)}"}
+        self._invalidate_report()
+        
+        if not row:
+            return {"error": f"Task with ID {task_id} not found"}
+        
+        title = row[0]
+        
+        return {
+            "success": True,
+            "task_id": task_id,
+            "title": title,
+            "message": f"Task '{title}' deleted successfully"
+        }
     
+    @_safe("complete task")
     def _complete_task(self, task_id: int) -> Dict[str, Any]:
         """Mark a task as completed"""
-        try:
-            if not task_id:
-                return {"error": "Task ID is required"}
-            
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Check if task exists
-            cursor.execute('SELECT title, status FROM tasks WHERE id = ?', (task_id,))
-            row = cursor.fetchone()
-            
-            if not row:
-                return {"error": f"Task with ID {task_id} not found"}
-            
-            title, current_status = row
-            
-            if current_status == 'completed':
-                return {"message": f"Task '{title}' is already completed"}
-            
-            # Mark as completed
-            cursor.execute('''
-                UPDATE tasks
-                SET status = 'completed', completed_at = CURRENT_TIMESTAMP,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (task_id,))
+        if not task_id:
+            return {"error": "Task ID is required"}
+        
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        
+        # Check if task exists
+        cursor.execute(SQL_SELECT_TASK_STATUS, (task_id,))
+        row = cursor.fetchone()
+        
+        if not row:
+            return {"error": f"Task with ID {task_id} not found"}
+        
+        title, current_status = row
+        
+        if current_status == 'completed':
+            return {"message": f"Task '{title}' is already completed"}
+        
+        # Mark as completed
+        with conn:
+            cursor.execute(SQL_COMPLETE_TASK, (task_id,))
+        self._invalidate_report()
+        
+        return {
+            "success": True,
+            "task_id": task_id,
+            "title": title,
+            "message": f"Task '{title}' marked as completed"
+        }
+    
+    @_safe("manage project")
+    def _manage_project(self, project_name: str, description: str = None) -> Dict[str, Any]:
+        """Create or list projects"""
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        
+        if project_name:
+            # Create new project
+            with conn:
+                cursor.execute(SQL_INSERT_PROJECT, (project_name, description))
             
-            conn.commit()
-            conn.close()
+            project_id = cursor.lastrowid
             
-            return {
+            result = {
                 "success": True,
-                "task_id": task_id,
-                "title": title,
-                "message": f"Task '{title}' marked as completed"
+                "project_id": project_id,
+                "name": project_name,
+                "description": description,
+                "message": f"Project '{project_name}' created successfully"
             }
+        else:
+            # List all projects
+            cursor.execute(SQL_LIST_PROJECTS)
             
-        except Exception as e:
-            return {"error": f"Failed to complete task: {str(e)}"}
-    
-    def _manage_project(self, name: str, description: str = None) -> Dict[str, Any]:
-        """Create or list projects"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            if name:
-                # Create new project
-                cursor.execute('''
-                    INSERT INTO projects (name, description)
-                    VALUES (?, ?)
-                ''', (name, description))
-                
-                project_id = cursor.lastrowid
-                conn.commit()
-                
-                result = {
-                    "success": True,
-                    "project_id": project_id,
-                    "name": name,
-                    "description": description,
-                    "message": f"Project '{name}' created successfully"
-                }
-            else:
-                # List all projects
-                cursor.execute('''
-                    SELECT id, name, description, status, created_at,
-                           (SELECT COUNT(*) FROM tasks WHERE project_id = p.id) as task_count
-                    FROM projects p
-                    ORDER BY created_at DESC
-                ''')
-                
-                projects = []
-                for row in cursor.fetchall():
-                    projects.append({
-                        "id": row[0],
-                        "name": row[1],
-                        "description": row[2],
-                        "status": row[3],
-                        "created_at": row[4],
-                        "task_count": row[5]
-                    })
-                
-                result = {
-                    "success": True,
-                    "count": len(projects),
-                    "projects": projects
-                }
-            
-            conn.close()
-            return result
+            projects = []
+            for row in cursor.fetchall():
+                projects.append({
+                    "id": row[0],
+                    "name": row[1],
+                    "description": row[2],
+                    "status": row[3],
+                    "created_at": row[4],
+                    "task_count": row[5]
+                })
             
-        except Exception as e:
-            return {"error": f"Failed to manage project: {str(e)}"}
+            result = {
+                "success": True,
+                "count": len(projects),
+                "projects": projects
+            }
+        
+        return result
     
+    @_safe("track time")
     def _track_time(self, task_id: int, hours: float, description: str = None) -> Dict[str, Any]:
         """Track time spent on a task"""
-        try:
-            if not task_id or not hours:
-                return {"error": "Task ID and hours are required"}
-            
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Check if task exists
-            cursor.execute('SELECT title, actual_hours FROM tasks WHERE id = ?', (task_id,))
+        if not task_id or not hours:
+            return {"error": "Task ID and hours are required"}
+        
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        
+        start_time = datetime.now().isoformat()
+        duration_minutes = int(hours * 60)
+        
+        with conn:
+            # Update task total hours; no row means the task doesn't exist
+            cursor.execute(SQL_ADD_ACTUAL_HOURS, (hours, task_id))
             row = cursor.fetchone()
             
-            if not row:
-                return {"error": f"Task with ID {task_id} not found"}
-            
-            title, current_hours = row
-            
-            # Log time
-            start_time = datetime.now().isoformat()
-            duration_minutes = int(hours * 60)
-            
-            cursor.execute('''
-                INSERT INTO time_logs (task_id, start_time, duration_minutes, description)
-                VALUES (?, ?, ?, ?)
-            ''', (task_id, start_time, duration_minutes, description))
-            
-            # Update task total hours
-            new_total_hours = (current_hours or 0) + hours
-            cursor.execute('''
-                UPDATE tasks SET actual_hours = ? WHERE id = ?
-            ''', (new_total_hours, task_id))
-            
-            conn.commit()
-            conn.close()
-            
-            return {
-                "success": True,
-                "task_id": task_id,
-                "title": title,
-                "hours_logged": hours,
-                "total_hours": new_total_hours,
-                "description": description,
-                "message": f"Logged {hours} hours for task '{title}'"
-            }
-            
-        except Exception as e:
-            return {"error": f"Failed to track time: {str(e)}"}
+            if row:
+                # Log time
+                cursor.execute(SQL_INSERT_TIME_LOG, (task_id, start_time, duration_minutes, description))
+        self._invalidate_report()
+        
+        if not row:
+            return {"error": f"Task with ID {task_id} not found"}
+        
+        title, new_total_hours = row
+        
+        return {
+            "success": True,
+            "task_id": task_id,
+            "title": title,
+            "hours_logged": hours,
+            "total_hours": new_total_hours,
+            "description": description,
+            "message": f"Logged {hours} hours for task '{title}'"
+        }
     
+    @_safe("generate report")
     def _generate_report(self) -> Dict[str, Any]:
         """Generate productivity report"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Task status summary
-            cursor.execute('''
-                SELECT status, COUNT(*) as count
-                FROM tasks
-                GROUP BY status
-            ''')
-            status_summary = {row[0]: row[1] for row in cursor.fetchall()}
-            
-            # Priority breakdown
-            cursor.execute('''
-                SELECT priority, COUNT(*) as count
-                FROM tasks
-                WHERE status != 'completed'
-                GROUP BY priority
-                ORDER BY priority DESC
-            ''')
-            priority_breakdown = {f"Priority {row[0]}": row[1] for row in cursor.fetchall()}
-            
-            # Overdue tasks
-            today = datetime.now().date().isoformat()
-            cursor.execute('''
-                SELECT COUNT(*) FROM tasks
-                WHERE due_date < ? AND status != 'completed'
-            ''', (today,))
-            overdue_count = cursor.fetchone()[0]
-            
-            # Time tracking summary
-            cursor.execute('''
-                SELECT SUM(actual_hours), SUM(estimated_hours)
-                FROM tasks
-                WHERE status = 'completed'
-            ''')
-            time_row = cursor.fetchone()
-            total_actual = time_row[0] or 0
-            total_estimated = time_row[1] or 0
-            
-            # Recent completions
-            cursor.execute('''
-                SELECT title, completed_at
-                FROM tasks
-                WHERE status = 'completed'
-                ORDER BY completed_at DESC
-                LIMIT 5
-            ''')
-            recent_completions = [{"title": row[0], "completed_at": row[1]} for row in cursor.fetchall()]
-            
-            conn.close()
-            
-            return {
-                "success": True,
-                "report": {
-                    "status_summary": status_summary,
-                    "priority_breakdown": priority_breakdown,
-                    "overdue_tasks": overdue_count,
-                    "time_tracking": {
-                        "total_actual_hours": total_actual,
-                        "total_estimated_hours": total_estimated,
-                        "estimation_accuracy": (total_actual / total_estimated * 100) if total_estimated > 0 else 0
-                    },
-                    "recent_completions": recent_completions
-                }
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        
+        # Serve the cached report if no task has been written since it was built
+        today = datetime.now().date().isoformat()
+        version = (today, self._report_version)
+        
+        cached = self._report_cache
+        if cached and cached[0] == version and time.monotonic() - cached[1] < REPORT_CACHE_TTL:
+            return cached[2]
+        
+        # Status, priority, overdue, and hour totals in a single pass over tasks
+        cursor.execute(SQL_REPORT_AGGREGATES, (today,))
+        
+        status_summary = {}
+        priority_counts = {}
+        overdue_count = 0
+        total_actual = 0
+        total_estimated = 0
+        for status, priority, count, overdue, actual_hours, estimated_hours in cursor.fetchall():
+            status_summary[status] = status_summary.get(status, 0) + count
+            if status == 'completed':
+                total_actual += actual_hours or 0
+                total_estimated += estimated_hours or 0
+            else:
+                priority_counts[priority] = priority_counts.get(priority, 0) + count
+                overdue_count += overdue or 0
+        
+        priority_breakdown = {
+            f"Priority {priority}": priority_counts[priority]
+            for priority in sorted(priority_counts, reverse=True)
+        }
+        
+        # Recent completions
+        cursor.execute(SQL_RECENT_COMPLETIONS)
+        recent_completions = [{"title": row[0], "completed_at": row[1]} for row in cursor.fetchall()]
+        
+        result = {
+            "success": True,
+            "report": {
+                "status_summary": status_summary,
+                "priority_breakdown": priority_breakdown,
+                "overdue_tasks": overdue_count,
+                "time_tracking": {
+                    "total_actual_hours": total_actual,
+                    "total_estimated_hours": total_estimated,
+                    "estimation_accuracy": (total_actual / total_estimated * 100) if total_estimated > 0 else 0
+                },
+                "recent_completions": recent_completions
             }
-            
-        except Exception as e:
-            return {"error": f"Failed to generate report: {str(e)}"}
+        }
+        self._report_cache = (version, time.monotonic(), result)
+        
+        return result
+    
+    def _invalidate_report(self):
+        """Mark the cached report stale after a write to tasks"""
+        self._report_version += 1
+    
+    def _build_fts_query(self, query: str) -> str:
+        """Turn free text into an FTS5 expression matching every term as a prefix"""
+        terms = query.split()
+        return ' '.join('"' + term.replace('"', '""') + '"*' for term in terms)
     
     def _parse_tags(self, tags_str: str) -> List[str]:
         """Parse comma-separated tags string"""
         if not tags_str:
             return []
         
-        tags = [tag.strip().lower() for tag in tags_str.split(',')]
-        return [tag for tag in tags if tag]  # Remove empty tags
\ No newline at end of file
+        # Remove empty and duplicate tags, keeping first-seen order
+        return list(dict.fromkeys(tag for tag in _TAG_SPLIT.split(tags_str.lower().strip()) if tag))
\ No newline at end of file
@@ -5,15 +5,127 @@ Handles web searches for current information and research
 
 import os
 import json
+import time
+import asyncio
 import logging
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 from bs4 import BeautifulSoup
 import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+# Prefer the C-backed lxml parser; fall back to the stdlib parser if it's missing
+try:
+    import lxml.html
+    from lxml import etree
+    HTML_PARSER = 'lxml'
+except ImportError:
+    lxml = None
+    HTML_PARSER = 'html.parser'
+
+# selectolax parses DuckDuckGo result pages much faster than BeautifulSoup
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    SelectolaxParser = None
+
+# urllib3 only decodes brotli responses when a brotli package is installed
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on concurrent page fetches when extracting result content
+MAX_FETCH_WORKERS = 10
+
+# HTTP connection pool sizing for the shared session
+POOL_CONNECTIONS = 20
+POOL_MAXSIZE = 50
+
+# In-memory cache for repeated searches and page extractions
+CACHE_SIZE = 512
+CACHE_TTL = 600  # seconds
+
+# Precompiled patterns for _clean_extracted_text
+_WS_RE = re.compile(r'\s+')
+_BOILERPLATE_RE = re.compile(
+    r'(?:Cookie.*?Policy|Privacy.*?Policy|Terms.*?Service|Subscribe.*?Newsletter|Follow.*?us'
+    r'|\b(?:Home|About|Contact|Menu|Navigation)\b)',
+    re.IGNORECASE)
+_DOTS_RE = re.compile(r'\.{3,}')
+_DASHES_RE = re.compile(r'-{3,}')
+
+# Navigation words counted by _is_relevant_content
+_NAV_RELEVANCE_RE = re.compile(r'\b(?:home|about|contact|menu|login|register|search)\b', re.IGNORECASE)
+
+
+def _has_class(name: str) -> str:
+    """XPath predicate matching elements carrying the given CSS class"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Candidate main-content containers for page extraction, in priority order
+CONTENT_SELECTORS = [
+    'article',
+    'main',
+    '[role="main"]',
+    '.content',
+    '.post-content',
+    '.entry-content',
+    '.article-content',
+    '#content',
+    '.main-content'
+]
+
+if lxml is not None:
+    # CONTENT_SELECTORS as XPath queries, tried in the same priority order
+    CONTENT_XPATHS = tuple(etree.XPath(f"({path})[1]") for path in (
+        "//article",
+        "//main",
+        "//*[@role='main']",
+        f"//*[{_has_class('content')}]",
+        f"//*[{_has_class('post-content')}]",
+        f"//*[{_has_class('entry-content')}]",
+        f"//*[{_has_class('article-content')}]",
+        "//*[@id='content']",
+        f"//*[{_has_class('main-content')}]",
+    ))
+    STRIP_XPATH = etree.XPath("//script | //style | //nav | //footer")
+    
+    # DuckDuckGo result blocks and their fields
+    RESULT_XPATH = etree.XPath(f"(//div[{_has_class('result')}])[position() <= $n]")
+    RESULT_TITLE_XPATH = etree.XPath(f"(.//a[{_has_class('result__a')}])[1]")
+    RESULT_SNIPPET_XPATH = etree.XPath(f"(.//a[{_has_class('result__snippet')}])[1]")
+    RESULT_URL_XPATH = etree.XPath(f"(.//span[{_has_class('result__url')}])[1]")
+
+
+def _stripped_text(elements: list) -> Optional[str]:
+    """Text of the first element with each text node stripped, like get_text(strip=True)"""
+    if not elements:
+        return None
+    return "".join(text.strip() for text in elements[0].itertext())
+
+
+def _joined_text(element) -> str:
+    """Stripped text nodes joined by spaces, like BeautifulSoup's get_text(" ", strip=True)"""
+    return " ".join(text for text in (node.strip() for node in element.itertext()) if text)
+
+
+@lru_cache(maxsize=16)
+def _html_parser_for(encoding: Optional[str]):
+    """lxml HTML parser decoding with the response's declared encoding"""
+    return lxml.html.HTMLParser(encoding=encoding)
+
+
 class WebSearchTool:
     """Tool for searching the web for current information"""
     
@@ -27,8 +139,23 @@ class WebSearchTool:
         self.default_engine = "duckduckgo"
         self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Accept-Encoding': ACCEPT_ENCODING
         })
+        
+        # Keep connections alive across concurrent fetches and retry transient failures
+        adapter = HTTPAdapter(
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # LRU + TTL caches shared by the content-extraction worker threads
+        self._search_cache = OrderedDict()
+        self._page_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
     
     def get_function_schema(self) -> Dict[str, Any]:
         """Get the function schema for Letta"""
@@ -82,8 +209,16 @@ class WebSearchTool:
             # Modify query based on parameters
             search_query = self._build_search_query(query, search_type, time_filter, site)
             
-            # Perform search
-            search_results = self._search_duckduckgo(search_query, num_results)
+            # Perform search, reusing recent results for the same query
+            cache_key = (search_query.strip().lower(), num_results)
+            search_results = self._get_cached(self._search_cache, cache_key)
+            if search_results is None:
+                search_results = self._search_duckduckgo(search_query, num_results)
+                if search_results:
+                    self._save_to_cache(self._search_cache, cache_key, search_results)
+            
+            # Callers may enrich results in place, so hand out copies
+            search_results = [dict(result) for result in search_results]
             
             if not search_results:
                 return {"error": "No search results found"}
@@ -107,6 +242,14 @@ class WebSearchTool:
             logger.error(f"Error in web search: {e}")
             return {"error": str(e)}
     
+    async def execute_async(self, query: str, num_results: int = 5, search_type: str = "general",
+                            time_filter: str = "any", site: str = None,
+                            extract_content: bool = False) -> Dict[str, Any]:
+        """Execute web search without blocking the event loop"""
+        return await asyncio.to_thread(
+            self.execute, query, num_results, search_type, time_filter, site, extract_content
+        )
+    
     def _build_search_query(self, query: str, search_type: str, time_filter: str, site: str) -> str:
         """Build search query with modifiers"""
         search_query = query
@@ -153,40 +296,12 @@ class WebSearchTool:
             response.raise_for_status()
             
             # Parse HTML response
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            results = []
-            result_items = soup.find_all('div', class_='result')[:num_results]
-            
-            for item in result_items:
-                try:
-                    # Extract title
-                    title_elem = item.find('a', class_='result__a')
-                    title = title_elem.get_text(strip=True) if title_elem else "No title"
-                    
-                    # Extract URL
-                    url = title_elem.get('href') if title_elem else ""
-                    
-                    # Extract snippet
-                    snippet_elem = item.find('a', class_='result__snippet')
-                    snippet = snippet_elem.get_text(strip=True) if snippet_elem else ""
-                    
-                    # Extract displayed URL
-                    url_elem = item.find('span', class_='result__url')
-                    display_url = url_elem.get_text(strip=True) if url_elem else url
-                    
-                    if title and url:
-                        results.append({
-                            "title": title,
-                            "url": url,
-                            "snippet": snippet,
-                            "display_url": display_url,
-                            "source": "DuckDuckGo"
-                        })
-                
-                except Exception as e:
-                    logger.warning(f"Error parsing search result: {e}")
-                    continue
+            if SelectolaxParser is not None:
+                results = self._parse_results_selectolax(response, num_results)
+            elif lxml is not None:
+                results = self._parse_results_lxml(response, num_results)
+            else:
+                results = self._parse_results_bs4(response, num_results)
             
             return results
             
@@ -194,6 +309,101 @@ class WebSearchTool:
             logger.error(f"Error searching DuckDuckGo: {e}")
             return self._fallback_search(query, num_results)
     
+    def _parse_results_selectolax(self, response: requests.Response, num_results: int) -> List[Dict[str, Any]]:
+        """Parse DuckDuckGo results with selectolax"""
+        tree = SelectolaxParser(response.text)
+        
+        results = []
+        for item in tree.css('div.result')[:num_results]:
+            try:
+                title_elem = item.css_first('a.result__a')
+                snippet_elem = item.css_first('a.result__snippet')
+                url_elem = item.css_first('span.result__url')
+                
+                result = self._build_result(
+                    title_elem.text(strip=True) if title_elem else None,
+                    title_elem.attributes.get('href') if title_elem else None,
+                    snippet_elem.text(strip=True) if snippet_elem else None,
+                    url_elem.text(strip=True) if url_elem else None
+                )
+                if result:
+                    results.append(result)
+            
+            except Exception as e:
+                logger.warning(f"Error parsing search result: {e}")
+                continue
+        
+        return results
+    
+    def _parse_results_lxml(self, response: requests.Response, num_results: int) -> List[Dict[str, Any]]:
+        """Parse DuckDuckGo results with lxml and precompiled XPath queries when selectolax is missing"""
+        tree = lxml.html.document_fromstring(response.content,
+                                             parser=_html_parser_for(response.encoding))
+        
+        results = []
+        for item in RESULT_XPATH(tree, n=num_results):
+            try:
+                title_elems = RESULT_TITLE_XPATH(item)
+                
+                result = self._build_result(
+                    _stripped_text(title_elems),
+                    title_elems[0].get('href') if title_elems else None,
+                    _stripped_text(RESULT_SNIPPET_XPATH(item)),
+                    _stripped_text(RESULT_URL_XPATH(item))
+                )
+                if result:
+                    results.append(result)
+            
+            except Exception as e:
+                logger.warning(f"Error parsing search result: {e}")
+                continue
+        
+        return results
+    
+    def _parse_results_bs4(self, response: requests.Response, num_results: int) -> List[Dict[str, Any]]:
+        """Parse DuckDuckGo results with BeautifulSoup"""
+        soup = self._parse_html(response)
+        
+        results = []
+        result_items = soup.find_all('div', class_='result')[:num_results]
+        
+        for item in result_items:
+            try:
+                title_elem = item.find('a', class_='result__a')
+                snippet_elem = item.find('a', class_='result__snippet')
+                url_elem = item.find('span', class_='result__url')
+                
+                result = self._build_result(
+                    title_elem.get_text(strip=True) if title_elem else None,
+                    title_elem.get('href') if title_elem else None,
+                    snippet_elem.get_text(strip=True) if snippet_elem else None,
+                    url_elem.get_text(strip=True) if url_elem else None
+                )
+                if result:
+                    results.append(result)
+            
+            except Exception as e:
+                logger.warning(f"Error parsing search result: {e}")
+                continue
+        
+        return results
+    
+    def _build_result(self, title: Optional[str], url: Optional[str], snippet: Optional[str],
+                      display_url: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Build a DuckDuckGo result from extracted fields; None for results without a link"""
+        if title is None:
+            title = "No title"
+        if not title or not url:
+            return None
+        
+        return {
+            "title": title,
+            "url": url,
+            "snippet": snippet or "",
+            "display_url": url if display_url is None else display_url,
+            "source": "DuckDuckGo"
+        }
+    
     def _fallback_search(self, query: str, num_results: int) -> List[Dict[str, Any]]:
         """Fallback search method"""
         try:
@@ -204,7 +414,7 @@ class WebSearchTool:
             response = self.session.post(search_url, data=params, timeout=10)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = self._parse_html(response)
             results = []
             
             # Look for results with different selectors
@@ -234,67 +444,48 @@ class WebSearchTool:
     
     def _extract_content_from_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Extract and summarize content from search results"""
-        enhanced_results = []
+        if not results:
+            return []
         
-        for result in results:
-            try:
-                # Extract content from the webpage
-                content = self._extract_webpage_content(result["url"])
-                
-                if content:
-                    result["content"] = content
-                    result["word_count"] = len(content.split())
-                else:
-                    result["content"] = result.get("snippet", "")
-                    result["word_count"] = len(result["content"].split())
-                
-                enhanced_results.append(result)
-                
-            except Exception as e:
-                logger.warning(f"Error extracting content from {result['url']}: {e}")
+        # Pages are fetched concurrently; map() keeps the original result order
+        with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(results))) as executor:
+            return list(executor.map(self._add_result_content, results))
+    
+    def _add_result_content(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Attach extracted page content to a single search result"""
+        try:
+            # Extract content from the webpage
+            content = self._extract_webpage_content(result["url"])
+            
+            if content:
+                result["content"] = content
+                result["word_count"] = len(content.split())
+            else:
                 result["content"] = result.get("snippet", "")
                 result["word_count"] = len(result["content"].split())
-                enhanced_results.append(result)
+            
+        except Exception as e:
+            logger.warning(f"Error extracting content from {result['url']}: {e}")
+            result["content"] = result.get("snippet", "")
+            result["word_count"] = len(result["content"].split())
         
-        return enhanced_results
+        return result
     
     def _extract_webpage_content(self, url: str, max_chars: int = 2000) -> str:
         """Extract main content from a webpage"""
+        cache_key = (url, max_chars)
+        cached = self._get_cached(self._page_cache, cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             response = self.session.get(url, timeout=10)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-            
-            # Try to find main content areas
-            content_selectors = [
-                'article',
-                'main',
-                '[role="main"]',
-                '.content',
-                '.post-content',
-                '.entry-content',
-                '.article-content',
-                '#content',
-                '.main-content'
-            ]
-            
-            content_text = ""
-            for selector in content_selectors:
-                content_elem = soup.select_one(selector)
-                if content_elem:
-                    content_text = content_elem.get_text(strip=True)
-                    break
-            
-            # Fallback to body if no main content found
-            if not content_text:
-                body = soup.find('body')
-                if body:
-                    content_text = body.get_text(strip=True)
+            if lxml is not None:
+                content_text = self._extract_text_lxml(response)
+            else:
+                content_text = self._extract_text_bs4(response)
             
             # Clean up the text
             content_text = self._clean_extracted_text(content_text)
@@ -303,33 +494,89 @@ class WebSearchTool:
             if len(content_text) > max_chars:
                 content_text = content_text[:max_chars] + "..."
             
+            self._save_to_cache(self._page_cache, cache_key, content_text)
             return content_text
             
         except Exception as e:
             logger.warning(f"Error extracting content from {url}: {e}")
             return ""
     
+    def _get_cached(self, cache: OrderedDict, key: tuple) -> Any:
+        """Return a cached value if present and not expired"""
+        with self._cache_lock:
+            entry = cache.get(key)
+            if entry is None:
+                return None
+            
+            cached_at, value = entry
+            if time.monotonic() - cached_at > CACHE_TTL:
+                del cache[key]
+                return None
+            
+            cache.move_to_end(key)
+            return value
+    
+    def _save_to_cache(self, cache: OrderedDict, key: tuple, value: Any):
+        """Store a value, evicting the least recently used entry"""
+        with self._cache_lock:
+            cache[key] = (time.monotonic(), value)
+            cache.move_to_end(key)
+            if len(cache) > CACHE_SIZE:
+                cache.popitem(last=False)
+    
+    def _extract_text_lxml(self, response: requests.Response) -> str:
+        """Extract main text with lxml and precompiled XPath queries"""
+        tree = lxml.html.document_fromstring(response.content,
+                                             parser=_html_parser_for(response.encoding))
+        
+        # Remove script, style, and page chrome
+        for element in STRIP_XPATH(tree):
+            element.drop_tree()
+        
+        for xpath in CONTENT_XPATHS:
+            nodes = xpath(tree)
+            if nodes:
+                return _joined_text(nodes[0])
+        
+        # Fallback to body if no main content found
+        body = tree.find('body')
+        return _joined_text(body) if body is not None else ""
+    
+    def _extract_text_bs4(self, response: requests.Response) -> str:
+        """Extract main text with BeautifulSoup when lxml isn't installed"""
+        soup = self._parse_html(response)
+        
+        # Remove script, style, and page chrome
+        for script in soup(["script", "style", "nav", "footer"]):
+            script.decompose()
+        
+        for selector in CONTENT_SELECTORS:
+            content_elem = soup.select_one(selector)
+            if content_elem:
+                return content_elem.get_text(" ", strip=True)
+        
+        # Fallback to body if no main content found
+        body = soup.find('body')
+        return body.get_text(" ", strip=True) if body else ""
+    
+    def _parse_html(self, response: requests.Response) -> BeautifulSoup:
+        """Parse a response body, handing the raw bytes to the parser"""
+        return BeautifulSoup(response.content, HTML_PARSER, from_encoding=response.encoding)
+    
     def _clean_extracted_text(self, text: str) -> str:
         """Clean extracted text"""
         if not text:
             return ""
         
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove common unwanted patterns
-        text = re.sub(r'Cookie.*?Policy', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'Privacy.*?Policy', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'Terms.*?Service', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'Subscribe.*?Newsletter', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'Follow.*?us', '', text, flags=re.IGNORECASE)
+        text = _WS_RE.sub(' ', text)
         
-        # Remove navigation-like text
-        text = re.sub(r'\b(Home|About|Contact|Menu|Navigation)\b', '', text, flags=re.IGNORECASE)
+        # Remove common unwanted patterns and navigation-like text in a single pass
+        text = _BOILERPLATE_RE.sub('', text)
         
         # Remove multiple dots and dashes
-        text = re.sub(r'\.{3,}', '...', text)
-        text = re.sub(r'-{3,}', '---', text)
+        text = _DOTS_RE.sub('...', text)
+        text = _DASHES_RE.sub('---', text)
         
         return text.strip()
     
@@ -338,14 +585,14 @@ class WebSearchTool:
         if not text or len(text) < min_length:
             return False
         
-        # Check if it's mostly navigation or boilerplate
-        navigation_words = ['home', 'about', 'contact', 'menu', 'login', 'register', 'search']
-        words = text.lower().split()
+        # Extracted text is whitespace-normalized, so spaces delimit words
+        word_count = text.count(' ') + 1
         
-        if len(words) < 20:
+        if word_count < 20:
             return False
         
-        nav_word_count = sum(1 for word in words if word in navigation_words)
-        nav_ratio = nav_word_count / len(words)
+        # Check if it's mostly navigation or boilerplate
+        nav_word_count = sum(1 for _ in _NAV_RELEVANCE_RE.finditer(text))
+        nav_ratio = nav_word_count / word_count
         
-        return nav_ratio < 0.3  # Less than 30% navigation words
\ No newline at end of file
+        return nav_ratio < 0.3  # Less than 30% navigation words
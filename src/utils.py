@@ -4,65 +4,108 @@ Utility functions for the Letta Knowledge Management System
 
 import os
 import re
+import json
+import uuid
 import hashlib
-import mimetypes
+from collections import Counter
+from functools import lru_cache
 from datetime import datetime
 from typing import List, Dict, Any, Optional
-import magic
 
+# libmagic is only needed for is_text_file(accurate=True)
+try:
+    import magic
+except ImportError:
+    magic = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# File extensions accepted for upload
+ALLOWED_EXTENSIONS = frozenset({
+    'txt', 'md', 'pdf', 'docx', 'doc', 'csv', 'xlsx', 'xls', 
+    'json', 'xml', 'html', 'htm', 'rtf', 'odt', 'pptx', 'ppt'
+})
+
+# Common file type mappings
+_TYPE_MAPPING = {
+    '.pdf': 'PDF Document',
+    '.docx': 'Word Document',
+    '.doc': 'Word Document',
+    '.txt': 'Text File',
+    '.md': 'Markdown File',
+    '.csv': 'CSV File',
+    '.xlsx': 'Excel Spreadsheet',
+    '.xls': 'Excel Spreadsheet',
+    '.json': 'JSON File',
+    '.xml': 'XML File',
+    '.html': 'HTML File',
+    '.htm': 'HTML File',
+    '.rtf': 'Rich Text Format',
+    '.odt': 'OpenDocument Text',
+    '.pptx': 'PowerPoint Presentation',
+    '.ppt': 'PowerPoint Presentation'
+}
+
+# Units used by format_file_size
+_SIZE_NAMES = ("B", "KB", "MB", "GB", "TB")
+
+# Common English stop words ignored by extract_keywords
+STOP_WORDS = frozenset({
+    'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
+    'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been', 'be', 'have',
+    'has', 'had', 'will', 'would', 'could', 'should', 'may', 'might', 'can',
+    'this', 'that', 'these', 'those', 'a', 'an', 'you', 'i', 'we', 'they',
+    'he', 'she', 'it', 'his', 'her', 'our', 'their', 'my', 'your'
+})
+
+# Read size used when hashing files without hashlib.file_digest
+HASH_CHUNK_SIZE = 1 << 20
+
+# Extensions treated as text without inspecting the file
+TEXT_EXTENSIONS = frozenset({'.txt', '.md', '.csv', '.json', '.xml', '.html', '.htm', '.rtf'})
+
+# Bytes read from the start of a file when sniffing for text
+TEXT_SNIFF_SIZE = 8192
+
+# Precompiled patterns for the text helpers below
+_WS_RE = re.compile(r'\s+')
+_CLEAN_CHARS_RE = re.compile(r'[^\w\s\.\,\!\?\-\:\;\(\)]')
+_WORD_RE = re.compile(r'\b[a-zA-Z]{3,}\b')
+_KEYWORD_WORD_RE = re.compile(r'\b\w+\b')
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_UNSAFE_FILENAME_RE = re.compile(r'[<>:"/\\|?*]')
+_URL_RE = re.compile(
+    r'^https?://'  # http:// or https://
+    r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
+    r'localhost|'  # localhost...
+    r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
+    r'(?::\d+)?'  # optional port
+    r'(?:/?|[/?]\S+)$', re.IGNORECASE)
+
+@lru_cache(maxsize=4096)
 def allowed_file(filename: str) -> bool:
     """Check if file type is allowed for upload"""
-    ALLOWED_EXTENSIONS = {
-        'txt', 'md', 'pdf', 'docx', 'doc', 'csv', 'xlsx', 'xls', 
-        'json', 'xml', 'html', 'htm', 'rtf', 'odt', 'pptx', 'ppt'
-    }
-    
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    dot = filename.rfind('.')
+    return dot > 0 and filename[dot + 1:].lower() in ALLOWED_EXTENSIONS
 
 def get_file_type(filename: str) -> str:
     """Get file type from filename"""
-    try:
-        mime_type, _ = mimetypes.guess_type(filename)
-        extension = os.path.splitext(filename)[1].lower()
-        
-        # Common file type mappings
-        type_mapping = {
-            '.pdf': 'PDF Document',
-            '.docx': 'Word Document',
-            '.doc': 'Word Document',
-            '.txt': 'Text File',
-            '.md': 'Markdown File',
-            '.csv': 'CSV File',
-            '.xlsx': 'Excel Spreadsheet',
-            '.xls': 'Excel Spreadsheet',
-            '.json': 'JSON File',
-            '.xml': 'XML File',
-            '.html': 'HTML File',
-            '.htm': 'HTML File',
-            '.rtf': 'Rich Text Format',
-            '.odt': 'OpenDocument Text',
-            '.pptx': 'PowerPoint Presentation',
-            '.ppt': 'PowerPoint Presentation'
-        }
-        
-        return type_mapping.get(extension, 'Unknown File Type')
-        
-    except Exception:
-        return 'Unknown File Type'
+    return _TYPE_MAPPING.get(os.path.splitext(filename)[1].lower(), 'Unknown File Type')
 
 def format_file_size(size_bytes: int) -> str:
     """Format file size in human readable format"""
     if size_bytes == 0:
         return "0 B"
     
-    size_names = ["B", "KB", "MB", "GB", "TB"]
+    # Each unit is 2**10 of the previous one, so the bit length picks the unit
     i = 0
-    while size_bytes >= 1024 and i < len(size_names) - 1:
-        size_bytes /= 1024.0
-        i += 1
+    if size_bytes > 0:
+        i = min((int(size_bytes).bit_length() - 1) // 10, len(_SIZE_NAMES) - 1)
     
-    return f"{size_bytes:.1f} {size_names[i]}"
+    return f"{size_bytes / (1 << (10 * i)):.1f} {_SIZE_NAMES[i]}"
 
 def format_timestamp(timestamp: str) -> str:
     """Format timestamp for display"""
@@ -75,11 +118,20 @@ def format_timestamp(timestamp: str) -> str:
 def calculate_file_hash(file_path: str) -> str:
     """Calculate SHA-256 hash of a file"""
     try:
-        hash_sha256 = hashlib.sha256()
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_sha256.update(chunk)
-        return hash_sha256.hexdigest()
+            if hasattr(hashlib, "file_digest"):
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            
+            # Python < 3.11: reuse one buffer instead of allocating per chunk
+            hash_sha256 = hashlib.sha256()
+            buffer = bytearray(HASH_CHUNK_SIZE)
+            view = memoryview(buffer)
+            while True:
+                size = f.readinto(buffer)
+                if not size:
+                    break
+                hash_sha256.update(view[:size])
+            return hash_sha256.hexdigest()
     except Exception:
         return ""
 
@@ -89,10 +141,10 @@ def clean_text(text: str) -> str:
         return ""
     
     # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text)
+    text = _WS_RE.sub(' ', text)
     
     # Remove special characters but keep basic punctuation
-    text = re.sub(r'[^\w\s\.\,\!\?\-\:\;\(\)]', '', text)
+    text = _CLEAN_CHARS_RE.sub('', text)
     
     # Strip leading/trailing whitespace
     text = text.strip()
@@ -105,36 +157,22 @@ def extract_keywords(text: str, max_keywords: int = 10) -> List[str]:
         return []
     
     # Convert to lowercase and split into words
-    words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
+    words = _WORD_RE.findall(text.lower())
     
-    # Filter out common stop words
-    stop_words = {
-        'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
-        'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been', 'be', 'have',
-        'has', 'had', 'will', 'would', 'could', 'should', 'may', 'might', 'can',
-        'this', 'that', 'these', 'those', 'a', 'an', 'you', 'i', 'we', 'they',
-        'he', 'she', 'it', 'his', 'her', 'our', 'their', 'my', 'your'
-    }
-    
-    # Count word frequencies
-    word_count = {}
-    for word in words:
-        if word not in stop_words and len(word) > 2:
-            word_count[word] = word_count.get(word, 0) + 1
+    # Count word frequencies, skipping stop words
+    word_count = Counter(word for word in words if word not in STOP_WORDS)
     
-    # Sort by frequency and return top keywords
-    sorted_words = sorted(word_count.items(), key=lambda x: x[1], reverse=True)
-    return [word for word, count in sorted_words[:max_keywords]]
+    # Return the most frequent keywords
+    return [word for word, count in word_count.most_common(max_keywords)]
 
 def validate_email(email: str) -> bool:
     """Validate email address format"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return _EMAIL_RE.match(email) is not None
 
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename for safe storage"""
     # Remove or replace unsafe characters
-    filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
+    filename = _UNSAFE_FILENAME_RE.sub('_', filename)
     
     # Remove leading/trailing dots and spaces
     filename = filename.strip('. ')
@@ -160,13 +198,14 @@ def parse_tags(tags_input: str) -> List[str]:
     if not tags_input:
         return []
     
-    # Split by comma and clean each tag
-    tags = [tag.strip().lower() for tag in tags_input.split(',')]
-    
-    # Remove empty tags and duplicates
-    tags = list(set(tag for tag in tags if tag))
+    # Single tag, nothing to split or deduplicate
+    if ',' not in tags_input:
+        tag = tags_input.strip().lower()
+        return [tag] if tag else []
     
-    return tags
+    # Split by comma, clean each tag, and drop empties and duplicates in order
+    tags = (tag.strip().lower() for tag in tags_input.split(','))
+    return list(dict.fromkeys(tag for tag in tags if tag))
 
 def format_tags(tags: List[str]) -> str:
     """Format tags list for display"""
@@ -177,15 +216,11 @@ def format_tags(tags: List[str]) -> str:
 
 def is_valid_url(url: str) -> bool:
     """Check if string is a valid URL"""
-    url_pattern = re.compile(
-        r'^https?://'  # http:// or https://
-        r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
-        r'localhost|'  # localhost...
-        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
-        r'(?::\d+)?'  # optional port
-        r'(?:/?|[/?]\S+)$', re.IGNORECASE)
+    # Cheap scheme prefilter before the full pattern (which ignores case)
+    if not url or url[:4].lower() != 'http':
+        return False
     
-    return url_pattern.match(url) is not None
+    return _URL_RE.match(url) is not None
 
 def get_file_info(file_path: str) -> Dict[str, Any]:
     """Get comprehensive file information"""
@@ -219,7 +254,6 @@ def create_directory_if_not_exists(directory: str) -> bool:
 def safe_json_loads(json_string: str, default: Any = None) -> Any:
     """Safely load JSON string with default fallback"""
     try:
-        import json
         return json.loads(json_string)
     except Exception:
         return default
@@ -227,7 +261,8 @@ def safe_json_loads(json_string: str, default: Any = None) -> Any:
 def safe_json_dumps(obj: Any, default: str = "{}") -> str:
     """Safely dump object to JSON string with default fallback"""
     try:
-        import json
+        if orjson is not None:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
         return json.dumps(obj, ensure_ascii=False, indent=2)
     except Exception:
         return default
@@ -238,7 +273,7 @@ def normalize_whitespace(text: str) -> str:
         return ""
     
     # Replace multiple whitespace with single space
-    text = re.sub(r'\s+', ' ', text)
+    text = _WS_RE.sub(' ', text)
     
     # Remove leading/trailing whitespace
     text = text.strip()
@@ -258,15 +293,14 @@ def get_text_statistics(text: str) -> Dict[str, int]:
     # Count characters
     char_count = len(text)
     
-    # Count words
-    word_count = len(re.findall(r'\b\w+\b', text))
+    # Count words without materializing the match list
+    word_count = sum(1 for _ in _KEYWORD_WORD_RE.finditer(text))
     
     # Count lines
-    line_count = len(text.split('\n'))
+    line_count = text.count('\n') + 1
     
     # Count paragraphs (empty lines separate paragraphs)
-    paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
-    paragraph_count = len(paragraphs)
+    paragraph_count = sum(1 for p in text.split('\n\n') if p and not p.isspace())
     
     return {
         'characters': char_count,
@@ -288,7 +322,6 @@ def format_duration(seconds: float) -> str:
 
 def generate_unique_id(prefix: str = "") -> str:
     """Generate a unique ID with optional prefix"""
-    import uuid
     unique_id = str(uuid.uuid4())
     
     if prefix:
@@ -296,14 +329,36 @@ def generate_unique_id(prefix: str = "") -> str:
     
     return unique_id
 
-def is_text_file(file_path: str) -> bool:
+def is_text_file(file_path: str, accurate: bool = False) -> bool:
     """Check if file is a text file"""
+    extension = os.path.splitext(file_path)[1].lower()
+    
+    if accurate and magic is not None:
+        try:
+            # Full libmagic detection when the caller needs it
+            file_type = magic.from_file(file_path, mime=True)
+            return file_type.startswith('text/')
+        except Exception:
+            return extension in TEXT_EXTENSIONS
+    
+    # Known text extensions don't need to be opened
+    if extension in TEXT_EXTENSIONS:
+        return True
+    
     try:
-        # Try to detect file type using python-magic
-        file_type = magic.from_file(file_path, mime=True)
-        return file_type.startswith('text/')
+        # Sniff the header: NUL bytes or invalid UTF-8 mean binary
+        with open(file_path, 'rb') as f:
+            head = f.read(TEXT_SNIFF_SIZE)
+        if b'\x00' in head:
+            return False
+        head.decode('utf-8')
+        return True
+    except UnicodeDecodeError:
+        # The read may have split a multi-byte character at the boundary
+        try:
+            head[:-3].decode('utf-8')
+            return len(head) == TEXT_SNIFF_SIZE
+        except UnicodeDecodeError:
+            return False
     except Exception:
-        # Fallback to extension-based detection
-        text_extensions = {'.txt', '.md', '.csv', '.json', '.xml', '.html', '.htm', '.rtf'}
-        extension = os.path.splitext(file_path)[1].lower()
-        return extension in text_extensions
\ No newline at end of file
+        return False
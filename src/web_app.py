@@ -2,23 +2,47 @@
 Letta Knowledge Management & Personal Assistant Web Application
 """
 
+# Patch blocking sockets before redis/requests are imported so agent and
+# search I/O yields to other requests instead of pinning a worker thread
+try:
+    from gevent import monkey
+    monkey.patch_all()
+    ASYNC_MODE = 'gevent'
+except ImportError:
+    ASYNC_MODE = 'threading'
+
 import os
 import json
+import time
+import uuid
+import hashlib
+import queue
 import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session, Response, stream_with_context
+from flask.json.provider import JSONProvider, DefaultJSONProvider
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
 from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash, check_password_hash
 import redis
+import msgspec
+from jinja2 import FileSystemBytecodeCache
 from dotenv import load_dotenv
 
 from agent_manager import AgentManager
 from knowledge_manager import KnowledgeManager
-from utils import allowed_file, get_file_type, format_timestamp
+from utils import allowed_file, get_file_type, format_timestamp, calculate_file_hash
+from tasks import celery_app, process_upload, SEARCH_CACHE_VERSION_KEY
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Load environment variables
 load_dotenv()
@@ -36,40 +60,275 @@ app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY', 'your-secret-key-here')
 app.config['UPLOAD_FOLDER'] = os.getenv('UPLOAD_FOLDER', './uploads')
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
 
-# Initialize extensions
-CORS(app)
-socketio = SocketIO(app, cors_allowed_origins="*")
+# Templates don't change within a deploy, so skip per-request mtime checks
+app.config['TEMPLATES_AUTO_RELOAD'] = False
+app.jinja_env.auto_reload = False
+
+if orjson is not None:
+    class ORJSONProvider(JSONProvider):
+        """Flask JSON provider backed by orjson, keeping Flask's handling of dates and other types"""
+        
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SERIALIZE_NUMPY
+        
+        def dumps(self, obj, **kwargs) -> str:
+            return orjson.dumps(obj, default=DefaultJSONProvider.default, option=self.options).decode()
+        
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+        
+        def response(self, *args, **kwargs):
+            obj = self._prepare_response_obj(args, kwargs)
+            body = orjson.dumps(obj, default=DefaultJSONProvider.default, option=self.options)
+            return self._app.response_class(body, mimetype='application/json')
+    
+    # jsonify() and request.get_json() now go through orjson
+    app.json = ORJSONProvider(app)
 
 # Initialize Redis (optional)
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', '64'))
 try:
-    redis_client = redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+    # Bounded pool of persistent connections shared by all greenlets; callers
+    # wait for a free connection instead of opening new ones under load
+    redis_pool = redis.BlockingConnectionPool.from_url(
+        REDIS_URL,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=5,
+        socket_keepalive=True,
+        health_check_interval=30
+    )
+    redis_client = redis.Redis(connection_pool=redis_pool)
     redis_client.ping()
     logger.info("Redis connected successfully")
 except Exception as e:
     logger.warning(f"Redis connection failed: {e}")
     redis_client = None
 
+# Queue upload processing only when a Celery worker is deployed alongside Redis
+UPLOAD_QUEUE = os.getenv('UPLOAD_QUEUE', 'false').lower() == 'true' and redis_client is not None
+
+# Initialize extensions
+# Only the JSON API is called cross-origin; Socket.IO handles its own CORS
+CORS(app, resources={r'/api/*': {'origins': '*'}})
+
+# With Redis, Socket.IO events are relayed through it so several worker
+# processes can serve connected clients
+# MessagePack framing keeps long chat replies smaller than JSON text packets
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=ASYNC_MODE, serializer='msgpack',
+                    message_queue=REDIS_URL if redis_client is not None else None)
+
+# Dashboard aggregates are cached briefly in Redis
+DASHBOARD_CACHE_TTL = int(os.getenv('DASHBOARD_CACHE_TTL', '10'))
+DASHBOARD_CACHE_KEYS = ('dash:agent_status', 'dash:recent_convs:5', 'dash:kb_stats', 'dash:memory')
+
+# Suffix of the key holding a cached payload's ETag
+ETAG_KEY_SUFFIX = ':etag'
+
+if orjson is not None:
+    def _cache_dumps(value) -> bytes:
+        return orjson.dumps(value, default=str, option=orjson.OPT_SERIALIZE_NUMPY)
+    
+    _cache_loads = orjson.loads
+else:
+    def _cache_dumps(value) -> str:
+        return json.dumps(value, default=str)
+    
+    _cache_loads = json.loads
+
+# Knowledge search results are cached under a version that writes bump
+SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', '300'))
+
+def _search_cache_key(query: str, version: int) -> str:
+    """Redis key for a search query under the given cache version"""
+    digest = hashlib.blake2b(query.encode('utf-8'), digest_size=16).hexdigest()
+    return f"search:v{version}:{digest}"
+
+def invalidate_search_cache():
+    """Retire cached search results after the knowledge base changes"""
+    if redis_client is None:
+        return
+    try:
+        redis_client.incr(SEARCH_CACHE_VERSION_KEY)
+    except Exception as e:
+        logger.warning(f"Redis search cache invalidation failed: {e}")
+
+def invalidate_dashboard_cache():
+    """Drop cached dashboard aggregates after a state change"""
+    if redis_client is None:
+        return
+    try:
+        redis_client.delete(*DASHBOARD_CACHE_KEYS, *(key + ETAG_KEY_SUFFIX for key in DASHBOARD_CACHE_KEYS))
+    except Exception as e:
+        logger.warning(f"Redis cache invalidation failed: {e}")
+
 # Initialize managers
 agent_manager = AgentManager()
 knowledge_manager = KnowledgeManager()
 
+# Request body schemas, decoded and validated in one pass
+class ChatRequest(msgspec.Struct):
+    message: str = ''
+
+class NoteRequest(msgspec.Struct):
+    title: str = ''
+    content: str = ''
+    tags: List[str] = []
+
+def decode_json_body(schema):
+    """Decode the request body into a schema, or None when it's malformed"""
+    try:
+        return msgspec.json.decode(request.get_data(cache=False), type=schema)
+    except msgspec.MsgspecError:
+        return None
+
+def _payload_etag(body: bytes, ignore: tuple) -> str:
+    """Hash of an encoded payload, leaving out the fields in `ignore`"""
+    if ignore:
+        payload = _cache_loads(body)
+        if isinstance(payload, dict):
+            body = _cache_dumps({key: value for key, value in payload.items() if key not in ignore})
+    if isinstance(body, str):
+        body = body.encode()
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+def conditional_jsonify(cache_key: str, loader, ignore: tuple = ()):
+    """JSON response for loader's payload with an ETag, answered with 304 when the client's copy matches"""
+    # The encoded payload and its ETag are memoized together, so repeat polls skip the loader entirely
+    body = etag = None
+    if redis_client is not None:
+        try:
+            body, etag = redis_client.mget(cache_key, cache_key + ETAG_KEY_SUFFIX)
+        except Exception as e:
+            logger.warning(f"Redis response cache read failed: {e}")
+    
+    if body is None:
+        body = _cache_dumps(loader())
+        etag = _payload_etag(body, ignore)
+        if redis_client is not None:
+            try:
+                pipe = redis_client.pipeline(transaction=False)
+                pipe.setex(cache_key, DASHBOARD_CACHE_TTL, body)
+                pipe.setex(cache_key + ETAG_KEY_SUFFIX, DASHBOARD_CACHE_TTL, etag)
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"Redis response cache write failed: {e}")
+    elif etag is None:
+        # Payload cached by get_dashboard_data, which doesn't store an ETag
+        etag = _payload_etag(body, ignore)
+    elif isinstance(etag, bytes):
+        etag = etag.decode()
+    
+    response = app.response_class(body, mimetype='application/json')
+    
+    # Fields in `ignore` change on every call and would defeat the ETag; the tag then
+    # identifies the payload's content rather than its exact bytes, so it's weak
+    response.set_etag(etag, weak=bool(ignore))
+    return response.make_conditional(request)
+
+# Second-resolution timestamp shared by responses within the same second
+_timestamp_cache = (0, '')
+
+def current_timestamp() -> str:
+    """ISO timestamp for the current second, formatted at most once per second"""
+    global _timestamp_cache
+    now = int(time.time())
+    cached_second, formatted = _timestamp_cache
+    if cached_second != now:
+        formatted = datetime.fromtimestamp(now).isoformat()
+        _timestamp_cache = (now, formatted)
+    return formatted
+
+# Independent manager lookups for page renders run in parallel
+executor = ThreadPoolExecutor(max_workers=8)
+
+# Identical read-only requests arriving together share one computation
+SINGLE_FLIGHT_TIMEOUT = 30
+_inflight: Dict[tuple, Future] = {}
+_inflight_lock = threading.Lock()
+
+def single_flight(key: tuple, fn, *args) -> Future:
+    """Return the in-flight future for key, starting fn on the executor if there is none"""
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is not None:
+            return future
+        future = executor.submit(fn, *args)
+        _inflight[key] = future
+    
+    def _forget(done):
+        with _inflight_lock:
+            if _inflight.get(key) is done:
+                del _inflight[key]
+    
+    future.add_done_callback(_forget)
+    return future
+
 # Ensure upload directory exists
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+UPLOAD_DIR = app.config['UPLOAD_FOLDER']
+os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs('./data', exist_ok=True)
 os.makedirs('./logs', exist_ok=True)
 
+# Keep compiled templates across restarts and compile them before the first request
+JINJA_CACHE_DIR = './data/jinja_cache'
+os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(JINJA_CACHE_DIR)
+for template_name in app.jinja_env.list_templates():
+    try:
+        app.jinja_env.get_template(template_name)
+    except Exception as e:
+        logger.warning(f"Failed to precompile template {template_name}: {e}")
+
+# Dashboard cache keys and the manager calls that fill them
+DASHBOARD_SOURCES = (
+    (DASHBOARD_CACHE_KEYS[0], agent_manager.get_agent_status),
+    (DASHBOARD_CACHE_KEYS[1], lambda: agent_manager.get_recent_conversations(limit=5)),
+    (DASHBOARD_CACHE_KEYS[2], knowledge_manager.get_stats),
+)
+
+def get_dashboard_data() -> List:
+    """Load dashboard aggregates, reading and refilling the Redis cache in one round trip each"""
+    cached = [None] * len(DASHBOARD_SOURCES)
+    if redis_client is not None:
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for key, _ in DASHBOARD_SOURCES:
+                pipe.get(key)
+            cached = pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis dashboard cache read failed: {e}")
+    
+    results = [_cache_loads(value) if value is not None else None for value in cached]
+    
+    # Recompute only the missing aggregates, concurrently
+    futures = {
+        i: executor.submit(loader)
+        for i, (_, loader) in enumerate(DASHBOARD_SOURCES)
+        if cached[i] is None
+    }
+    
+    # Fresh values go through the cache encoding too, so hits and misses have the same types
+    encoded = {i: _cache_dumps(future.result()) for i, future in futures.items()}
+    for i, value in encoded.items():
+        results[i] = _cache_loads(value)
+    
+    if encoded and redis_client is not None:
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for i, value in encoded.items():
+                pipe.setex(DASHBOARD_SOURCES[i][0], DASHBOARD_CACHE_TTL, value)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis dashboard cache write failed: {e}")
+    
+    return results
+
 @app.route('/')
 def index():
     """Main dashboard page"""
     try:
-        # Get agent status
-        agent_status = agent_manager.get_agent_status()
-        
-        # Get recent conversations
-        recent_conversations = agent_manager.get_recent_conversations(limit=5)
-        
-        # Get knowledge base stats
-        knowledge_stats = knowledge_manager.get_stats()
+        # Agent status, recent conversations, and knowledge base stats
+        agent_status, recent_conversations, knowledge_stats = get_dashboard_data()
         
         return render_template('index.html', 
                                agent_status=agent_status,
@@ -93,8 +352,10 @@ def knowledge():
     """Knowledge management page"""
     try:
         # Get all notes and documents
-        notes = knowledge_manager.get_all_notes()
-        documents = knowledge_manager.get_all_documents()
+        notes_future = executor.submit(knowledge_manager.get_all_notes)
+        documents_future = executor.submit(knowledge_manager.get_all_documents)
+        notes = notes_future.result()
+        documents = documents_future.result()
         
         return render_template('knowledge.html', 
                                notes=notes, 
@@ -108,8 +369,10 @@ def knowledge():
 def agent():
     """Agent management page"""
     try:
-        agent_info = agent_manager.get_agent_info()
-        memory_info = agent_manager.get_memory_info()
+        agent_info_future = executor.submit(agent_manager.get_agent_info)
+        memory_info_future = executor.submit(agent_manager.get_memory_info)
+        agent_info = agent_info_future.result()
+        memory_info = memory_info_future.result()
         
         return render_template('agent.html', 
                                agent_info=agent_info,
@@ -124,35 +387,103 @@ def agent():
 def api_chat():
     """Send message to agent"""
     try:
-        data = request.get_json()
-        message = data.get('message', '')
+        req = decode_json_body(ChatRequest)
+        if req is None:
+            return jsonify({'error': 'Invalid request body'}), 400
+        message = req.message
         
         if not message:
             return jsonify({'error': 'No message provided'}), 400
         
         # Send message to agent
         response = agent_manager.send_message(message)
+        invalidate_dashboard_cache()
         
         return jsonify({
             'success': True,
             'response': response,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': current_timestamp()
         })
     
     except Exception as e:
         logger.error(f"Error in chat API: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/chat/stream', methods=['POST'])
+def api_chat_stream():
+    """Send message to agent and stream the reply as Server-Sent Events"""
+    req = decode_json_body(ChatRequest)
+    message = req.message if req else ''
+    
+    if not message:
+        return jsonify({'error': 'No message provided'}), 400
+    
+    def generate():
+        try:
+            for token in agent_manager.stream_message(message):
+                yield f"data: {json.dumps({'token': token})}\n\n"
+            invalidate_dashboard_cache()
+            yield f"data: {json.dumps({'done': True, 'timestamp': current_timestamp()})}\n\n"
+        except Exception as e:
+            logger.error(f"Error in chat stream API: {e}")
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/api/memory', methods=['GET'])
 def api_memory():
     """Get agent memory information"""
     try:
-        memory_info = agent_manager.get_memory_info()
-        return jsonify(memory_info)
+        return conditional_jsonify(DASHBOARD_CACHE_KEYS[3], agent_manager.get_memory_info, ignore=('last_updated',))
     except Exception as e:
         logger.error(f"Error getting memory info: {e}")
         return jsonify({'error': str(e)}), 500
 
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+def _upload_fileno(file) -> Optional[int]:
+    """File descriptor behind an upload that Werkzeug spooled to a temp file, if any"""
+    # fileno() on an in-memory SpooledTemporaryFile would roll it over to disk first
+    if not getattr(file.stream, '_rolled', True):
+        return None
+    try:
+        return file.stream.fileno()
+    except (AttributeError, OSError):
+        return None  # In-memory upload
+
+def save_upload(file, file_path: str) -> str:
+    """Write an uploaded file to disk and return its SHA-256"""
+    src_fd = _upload_fileno(file)
+    if src_fd is not None and hasattr(os, 'sendfile'):
+        try:
+            # Copy kernel-side, then hash the destination while it's in the page cache
+            size = os.fstat(src_fd).st_size
+            with open(file_path, 'wb') as out:
+                offset = 0
+                while offset < size:
+                    sent = os.sendfile(out.fileno(), src_fd, offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+            content_hash = calculate_file_hash(file_path)
+            if content_hash:
+                return content_hash
+        except OSError as e:
+            logger.warning(f"sendfile upload copy failed, falling back to buffered copy: {e}")
+        file.stream.seek(0)
+    
+    # Stream to disk, hashing in the same pass
+    hash_sha256 = hashlib.sha256()
+    with open(file_path, 'wb') as out:
+        while True:
+            chunk = file.stream.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            out.write(chunk)
+            hash_sha256.update(chunk)
+    return hash_sha256.hexdigest()
+
 @app.route('/api/upload', methods=['POST'])
 def api_upload():
     """Upload file to knowledge base"""
@@ -166,11 +497,24 @@ def api_upload():
         
         if file and allowed_file(file.filename):
             filename = secure_filename(file.filename)
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(file_path)
+            
+            # Unique on disk so a same-named upload can't replace a file still waiting to be processed
+            file_path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4().hex}_{filename}")
+            content_hash = save_upload(file, file_path)
+            
+            # Hand processing to the background worker when one is configured
+            if UPLOAD_QUEUE:
+                job = process_upload.delay(file_path, filename, content_hash)
+                return jsonify({
+                    'success': True,
+                    'message': 'File uploaded, processing started',
+                    'task_id': job.id
+                }), 202
             
             # Process the uploaded file
-            result = knowledge_manager.process_file(file_path, filename)
+            result = knowledge_manager.process_file(file_path, filename, content_hash)
+            invalidate_search_cache()
+            invalidate_dashboard_cache()
             
             return jsonify({
                 'success': True,
@@ -184,6 +528,29 @@ def api_upload():
         logger.error(f"Error uploading file: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/upload/status/<task_id>', methods=['GET'])
+def api_upload_status(task_id):
+    """Get the processing status of an uploaded file"""
+    try:
+        job = celery_app.AsyncResult(task_id)
+        
+        if job.successful():
+            invalidate_dashboard_cache()
+            return jsonify({
+                'success': True,
+                'status': 'done',
+                'file_info': job.result
+            })
+        
+        if job.failed():
+            return jsonify({'status': 'failed', 'error': str(job.result)}), 500
+        
+        return jsonify({'status': job.state.lower()})
+    
+    except Exception as e:
+        logger.error(f"Error getting upload status: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/notes', methods=['GET', 'POST'])
 def api_notes():
     """Get or create notes"""
@@ -193,15 +560,17 @@ def api_notes():
             return jsonify(notes)
         
         elif request.method == 'POST':
-            data = request.get_json()
-            title = data.get('title', '')
-            content = data.get('content', '')
-            tags = data.get('tags', [])
+            req = decode_json_body(NoteRequest)
+            if req is None:
+                return jsonify({'error': 'Invalid request body'}), 400
+            title, content, tags = req.title, req.content, req.tags
             
             if not title or not content:
                 return jsonify({'error': 'Title and content are required'}), 400
             
             note = knowledge_manager.create_note(title, content, tags)
+            invalidate_search_cache()
+            invalidate_dashboard_cache()
             return jsonify({
                 'success': True,
                 'note': note
@@ -221,7 +590,31 @@ def api_search():
         if not query:
             return jsonify({'error': 'No query provided'}), 400
         
-        results = knowledge_manager.search(query)
+        # Serve repeated queries from Redis until the knowledge base changes
+        cache_key = None
+        if redis_client is not None:
+            try:
+                version = int(redis_client.get(SEARCH_CACHE_VERSION_KEY) or 0)
+                cache_key = _search_cache_key(query, version)
+                cached = redis_client.get(cache_key)
+                if cached is not None:
+                    return jsonify({
+                        'success': True,
+                        'results': _cache_loads(cached),
+                        'query': query
+                    })
+            except Exception as e:
+                logger.warning(f"Redis search cache read failed: {e}")
+                cache_key = None
+        
+        results = single_flight(('search', query), knowledge_manager.search, query).result(timeout=SINGLE_FLIGHT_TIMEOUT)
+        
+        # Empty results may come from a swallowed search failure, so they aren't cached
+        if cache_key is not None and results:
+            try:
+                redis_client.setex(cache_key, SEARCH_CACHE_TTL, _cache_dumps(results))
+            except Exception as e:
+                logger.warning(f"Redis search cache write failed: {e}")
         
         return jsonify({
             'success': True,
@@ -237,8 +630,7 @@ def api_search():
 def api_agent_status():
     """Get agent status"""
     try:
-        status = agent_manager.get_agent_status()
-        return jsonify(status)
+        return conditional_jsonify(DASHBOARD_CACHE_KEYS[0], agent_manager.get_agent_status)
     except Exception as e:
         logger.error(f"Error getting agent status: {e}")
         return jsonify({'error': str(e)}), 500
@@ -248,6 +640,7 @@ def api_agent_reset():
     """Reset agent memory"""
     try:
         result = agent_manager.reset_agent()
+        invalidate_dashboard_cache()
         return jsonify({
             'success': True,
             'message': 'Agent reset successfully',
@@ -262,7 +655,7 @@ def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'timestamp': datetime.now().isoformat(),
+        'timestamp': current_timestamp(),
         'version': '1.0.0'
     })
 
@@ -278,21 +671,76 @@ def handle_disconnect():
     """Handle client disconnection"""
     logger.info(f"Client disconnected: {request.sid}")
 
+# Chat messages arriving within a short window are sent to the agent together
+CHAT_BATCH_WINDOW = 0.03  # seconds
+CHAT_BATCH_SIZE = 16
+
+_chat_queue = queue.Queue()
+_chat_worker_started = False
+_chat_worker_lock = threading.Lock()
+
+def _ensure_chat_worker():
+    """Start the chat batching worker on first use"""
+    global _chat_worker_started
+    with _chat_worker_lock:
+        if not _chat_worker_started:
+            socketio.start_background_task(_chat_batch_worker)
+            _chat_worker_started = True
+
+def _collect_chat_batch() -> List[tuple]:
+    """Block for one queued message, then drain whatever arrives within the window"""
+    batch = [_chat_queue.get()]
+    deadline = time.monotonic() + CHAT_BATCH_WINDOW
+    
+    while len(batch) < CHAT_BATCH_SIZE:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(_chat_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+    
+    return batch
+
+def _chat_batch_worker():
+    """Group queued chat messages by client and send each group as one agent request"""
+    while True:
+        batch = _collect_chat_batch()
+        
+        messages_by_sid = {}
+        for sid, message in batch:
+            messages_by_sid.setdefault(sid, []).append(message)
+        
+        # Clients are answered independently so one slow reply doesn't hold up the rest
+        for sid, messages in messages_by_sid.items():
+            socketio.start_background_task(_answer_chat_messages, sid, messages)
+
+def _answer_chat_messages(sid: str, messages: List[str]):
+    """Send one client's batched messages to the agent and emit the reply"""
+    try:
+        response = agent_manager.send_batch(messages)
+        invalidate_dashboard_cache()
+        
+        # Emit response back to client
+        socketio.emit('chat_response', {
+            'message': "\n".join(messages),
+            'response': response,
+            'timestamp': current_timestamp()
+        }, to=sid)
+    except Exception as e:
+        logger.error(f"Error handling chat message: {e}")
+        socketio.emit('error', {'message': str(e)}, to=sid)
+
 @socketio.on('chat_message')
 def handle_chat_message(data):
     """Handle real-time chat message"""
     try:
         message = data.get('message', '')
         if message:
-            # Send to agent
-            response = agent_manager.send_message(message)
-            
-            # Emit response back to client
-            emit('chat_response', {
-                'message': message,
-                'response': response,
-                'timestamp': datetime.now().isoformat()
-            })
+            # Queue for the batching worker, which replies to this client
+            _ensure_chat_worker()
+            _chat_queue.put((request.sid, message))
     except Exception as e:
         logger.error(f"Error handling chat message: {e}")
         emit('error', {'message': str(e)})
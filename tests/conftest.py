@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Application modules import each other as top-level modules from src/. Tools are
+# also importable on their own (Letta loads them as standalone custom tools), which
+# keeps their tests clear of the package's heavyweight imports.
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+sys.path.insert(0, os.path.join(SRC_DIR, 'tools'))
+sys.path.insert(0, SRC_DIR)
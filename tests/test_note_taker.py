@@ -0,0 +1,80 @@
+"""
+Tests for the note taker's SQLite paths and its search cache
+"""
+
+import sqlite3
+
+import pytest
+
+import note_taker
+from note_taker import NoteTakerTool
+
+
+@pytest.fixture
+def notes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return NoteTakerTool()
+
+
+def test_schema_version_is_recorded(notes):
+    conn = sqlite3.connect(notes.db_path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == note_taker.NOTES_SCHEMA_VERSION
+    
+    # Reopening a migrated database keeps its notes
+    notes.execute("create", title="Kept", content="still here")
+    assert NoteTakerTool().execute("list")["count"] == 1
+
+
+def test_search_cache_is_keyed_on_the_raw_query(notes):
+    notes.execute("create", title="Plan", content="the budget plan")
+    notes.execute("create", title="Bare", content="budget")
+    
+    assert notes.execute("search", query="budget")["count"] == 2
+    
+    # Same words after normalizing, but the padded pattern matches fewer rows
+    padded = notes.execute("search", query=" BUDGET ")
+    assert padded["count"] == 1
+    assert padded["query"] == " BUDGET "
+
+
+def test_search_is_served_from_cache_until_a_write(notes, monkeypatch):
+    note_id = notes.execute("create", title="Groceries", content="milk and eggs")["note_id"]
+    
+    assert notes.execute("search", query="milk")["count"] == 1
+    assert len(notes._search_cache) == 1
+    
+    # A cached hit doesn't touch the database
+    with monkeypatch.context() as patch:
+        patch.setattr(note_taker.sqlite3, "connect", lambda *args, **kwargs: pytest.fail("cache miss"))
+        assert notes.execute("search", query="milk")["count"] == 1
+    
+    notes.execute("update", note_id=note_id, content="bread")
+    assert notes._search_cache == {}
+    assert notes.execute("search", query="milk")["count"] == 0
+
+
+def test_archived_notes_drop_out_of_search(notes):
+    note_id = notes.execute("create", title="Old idea", content="archive me")["note_id"]
+    assert notes.execute("search", query="archive")["count"] == 1
+    
+    assert notes.execute("archive", note_id=note_id)["status"] == "archived"
+    assert notes.execute("search", query="archive")["count"] == 0
+
+
+def test_search_snippets_are_truncated(notes):
+    notes.execute("create", title="Long", content="x" * (note_taker.SNIPPET_LENGTH + 50))
+    
+    content = notes.execute("search", query="Long")["notes"][0]["content"]
+    assert content == "x" * note_taker.SNIPPET_LENGTH + "..."
+
+
+def test_tag_counts_follow_create_and_delete(notes):
+    first = notes.execute("create", title="A", content="a", tags="work, ideas")["note_id"]
+    notes.execute("create", title="B", content="b", tags="work")
+    
+    counts = {tag["name"]: tag["count"] for tag in notes.execute("tag")["tags"]}
+    assert counts == {"work": 2, "ideas": 1}
+    
+    notes.execute("delete", note_id=first)
+    counts = {tag["name"]: tag["count"] for tag in notes.execute("tag")["tags"]}
+    assert counts == {"work": 1}
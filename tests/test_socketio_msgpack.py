@@ -0,0 +1,54 @@
+"""
+Socket.IO chat replies must survive the msgpack serializer
+"""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+msgpack = pytest.importorskip("msgpack")
+msgpack_packet = pytest.importorskip("socketio.msgpack_packet")
+try:
+    import agent_manager
+except ImportError as e:  # Letta client missing or incompatible
+    pytest.skip(f"agent_manager unavailable: {e}", allow_module_level=True)
+
+
+class FakeUsage:
+    """Stand-in for the Letta client's pydantic usage model"""
+    
+    def model_dump(self):
+        return {'completion_tokens': 12, 'prompt_tokens': 340, 'total_tokens': 352, 'step_count': 1}
+
+
+def make_manager():
+    """AgentManager wired to a fake Letta client returning a typical reply"""
+    response = SimpleNamespace(
+        usage=FakeUsage(),
+        messages=[
+            SimpleNamespace(message_type='tool_call', tool_name='note_taker',
+                            arguments='{"action": "search"}', result='[]'),
+            SimpleNamespace(message_type='assistant_message', content='No notes found.',
+                            date=datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)),
+        ]
+    )
+    client = SimpleNamespace(agents=SimpleNamespace(messages=SimpleNamespace(create=lambda **kwargs: response)))
+    
+    manager = agent_manager.AgentManager.__new__(agent_manager.AgentManager)
+    manager.client = client
+    manager.agent_id = 'agent-1'
+    manager.conversation_history = []
+    return manager
+
+
+def test_send_batch_result_packs_as_msgpack():
+    result = make_manager().send_batch(['find my notes'])
+    payload = {'message': 'find my notes', 'response': result, 'timestamp': datetime.now().isoformat()}
+    
+    encoded = msgpack_packet.MsgPackPacket(msgpack_packet.packet.EVENT, data=['chat_response', payload], namespace='/').encode()
+    decoded = msgpack_packet.MsgPackPacket(encoded_packet=encoded)
+    
+    assert decoded.data[1] == payload
+    assert decoded.data[1]['response']['messages'][0]['timestamp'] == '2024-05-01T12:30:00+00:00'
+    assert decoded.data[1]['response']['usage']['total_tokens'] == 352
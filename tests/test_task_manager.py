@@ -0,0 +1,145 @@
+"""
+Tests for the task manager's SQLite paths: schema migration, tags, FTS, and the report cache
+"""
+
+import sqlite3
+
+import pytest
+
+import task_manager
+from task_manager import TaskManagerTool
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return TaskManagerTool()
+
+
+def test_create_dedupes_tags(manager):
+    created = manager.execute("create", title="Pay rent", tags="Home, money,home")
+    assert created["tags"] == ["home", "money"]
+    
+    listed = manager.execute("list")["tasks"][0]
+    assert sorted(listed["tags"]) == ["home", "money"]
+
+
+def test_create_many_returns_the_inserted_id_range(manager):
+    manager.execute("create", title="Existing")
+    
+    created = manager.execute("create_many", tasks=[
+        {"title": "First", "tags": "a"},
+        {"title": "Second", "tags": "b, c"},
+        {"title": "Third"},
+    ])
+    assert created["task_ids"] == [2, 3, 4]
+    
+    tags_by_title = {task["title"]: sorted(task["tags"]) for task in manager.execute("list")["tasks"]}
+    assert tags_by_title == {"Existing": [], "First": ["a"], "Second": ["b", "c"], "Third": []}
+
+
+def test_create_many_requires_titles(manager):
+    assert "error" in manager.execute("create_many", tasks=[{"title": "ok"}, {"description": "no title"}])
+    assert manager.execute("list")["count"] == 0
+
+
+def test_search_index_follows_writes(manager):
+    task_id = manager.execute("create", title="Buy milk", tags="errands")["task_id"]
+    
+    # Terms match as prefixes, across title and tags
+    assert manager.execute("search", query="mil")["count"] == 1
+    assert manager.execute("search", query="errand")["count"] == 1
+    
+    manager.execute("update", task_id=task_id, title="Buy bread")
+    assert manager.execute("search", query="milk")["count"] == 0
+    assert manager.execute("search", query="bread")["count"] == 1
+    
+    manager.execute("delete", task_id=task_id)
+    assert manager.execute("search", query="bread")["count"] == 0
+
+
+def test_delete_cascades_to_time_logs(manager):
+    task_id = manager.execute("create", title="Write docs")["task_id"]
+    tracked = manager.execute("track", task_id=task_id, hours=1.5)
+    assert tracked["total_hours"] == 1.5
+    
+    manager.execute("delete", task_id=task_id)
+    
+    conn = sqlite3.connect(manager.db_path)
+    assert conn.execute("SELECT COUNT(*) FROM time_logs").fetchone()[0] == 0
+
+
+def test_report_is_cached_until_a_write(manager):
+    task_id = manager.execute("create", title="Plan sprint", priority=2)["task_id"]
+    
+    first = manager.execute("report")
+    assert manager.execute("report") is first
+    assert first["report"]["status_summary"] == {"pending": 1}
+    
+    # Same second as the create, and not a change to the newest row's timestamps
+    manager.execute("update", task_id=task_id, status="in_progress")
+    assert manager.execute("report")["report"]["status_summary"] == {"in_progress": 1}
+    
+    manager.execute("complete", task_id=task_id)
+    assert manager.execute("report")["report"]["status_summary"] == {"completed": 1}
+
+
+def test_report_expires_after_ttl(manager, monkeypatch):
+    manager.execute("create", title="Review")
+    first = manager.execute("report")
+    
+    monkeypatch.setattr(task_manager, "REPORT_CACHE_TTL", -1)
+    assert manager.execute("report") is not first
+
+
+def test_migrates_legacy_database(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    
+    # Schema from before task_tags, the FTS index, and the time_logs cascade
+    conn = sqlite3.connect(tmp_path / "data" / "tasks.db")
+    conn.executescript('''
+        CREATE TABLE projects (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, description TEXT,
+            status TEXT DEFAULT 'active', created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            completed_at TIMESTAMP, deadline TEXT
+        );
+        CREATE TABLE tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, description TEXT,
+            project_id INTEGER, priority INTEGER DEFAULT 0, status TEXT DEFAULT 'pending',
+            tags TEXT DEFAULT '[]', due_date TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            completed_at TIMESTAMP, estimated_hours REAL DEFAULT 0, actual_hours REAL DEFAULT 0,
+            FOREIGN KEY (project_id) REFERENCES projects (id)
+        );
+        CREATE TABLE time_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, task_id INTEGER NOT NULL, start_time TEXT NOT NULL,
+            end_time TEXT, duration_minutes INTEGER, description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (task_id) REFERENCES tasks (id)
+        );
+        INSERT INTO tasks (title, tags) VALUES ('Legacy quarterly taxes', '["finance", "q3"]');
+        INSERT INTO time_logs (task_id, start_time, duration_minutes) VALUES (1, '2024-01-01T09:00:00', 30);
+    ''')
+    conn.commit()
+    conn.close()
+    
+    manager = TaskManagerTool()
+    
+    # Tags are backfilled from the JSON column and existing rows are indexed
+    legacy = manager.execute("search", query="quarterly")["tasks"]
+    assert [task["title"] for task in legacy] == ["Legacy quarterly taxes"]
+    assert sorted(legacy[0]["tags"]) == ["finance", "q3"]
+    
+    # time_logs was rebuilt with its rows and the cascade
+    conn = sqlite3.connect(manager.db_path)
+    assert conn.execute("SELECT COUNT(*) FROM time_logs").fetchone()[0] == 1
+    assert any(fk[2] == "tasks" and fk[6] == "CASCADE" for fk in conn.execute("PRAGMA foreign_key_list(time_logs)"))
+    conn.close()
+    
+    manager.execute("delete", task_id=1)
+    conn = sqlite3.connect(manager.db_path)
+    assert conn.execute("SELECT COUNT(*) FROM time_logs").fetchone()[0] == 0
+    
+    # Reopening an already migrated database leaves it intact
+    assert TaskManagerTool().execute("list")["count"] == 0
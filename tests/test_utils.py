@@ -0,0 +1,91 @@
+"""
+Tests for the shared helpers in utils
+"""
+
+import hashlib
+
+import pytest
+
+import utils
+
+
+@pytest.mark.parametrize("filename, expected", [
+    ("report.PDF", True),
+    ("archive.tar.md", True),
+    ("notes.txt", True),
+    ("setup.exe", False),
+    ("README", False),
+    (".txt", False),
+    ("trailing.", False),
+])
+def test_allowed_file(filename, expected):
+    assert utils.allowed_file(filename) is expected
+
+
+def test_calculate_file_hash_matches_sha256(tmp_path):
+    data = b"letta" * (utils.HASH_CHUNK_SIZE // 4)  # spans several read chunks
+    path = tmp_path / "upload.bin"
+    path.write_bytes(data)
+    
+    assert utils.calculate_file_hash(str(path)) == hashlib.sha256(data).hexdigest()
+
+
+def test_calculate_file_hash_missing_file(tmp_path):
+    assert utils.calculate_file_hash(str(tmp_path / "missing.bin")) == ""
+
+
+def test_parse_tags_dedupes_in_order():
+    assert utils.parse_tags("Home, money,home , ,Work") == ["home", "money", "work"]
+    assert utils.parse_tags("  Solo  ") == ["solo"]
+    assert utils.parse_tags("") == []
+
+
+@pytest.mark.parametrize("size, expected", [
+    (0, "0 B"),
+    (512, "512.0 B"),
+    (1024, "1.0 KB"),
+    (1536, "1.5 KB"),
+    (5 * 1024 ** 3, "5.0 GB"),
+    (2048 * 1024 ** 4, "2048.0 TB"),
+])
+def test_format_file_size(size, expected):
+    assert utils.format_file_size(size) == expected
+
+
+def test_extract_keywords_orders_by_frequency_and_skips_stop_words():
+    text = "Budget review: the budget plan and the review of the budget"
+    assert utils.extract_keywords(text, max_keywords=3) == ["budget", "review", "plan"]
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://example.com/path?q=1", True),
+    ("HTTP://localhost:5000", True),
+    ("ftp://example.com", False),
+    ("example.com", False),
+    ("", False),
+])
+def test_is_valid_url(url, expected):
+    assert utils.is_valid_url(url) is expected
+
+
+def test_get_text_statistics():
+    stats = utils.get_text_statistics("One two three.\n\nFour five\n\n   \n")
+    assert stats == {'characters': 31, 'words': 5, 'lines': 6, 'paragraphs': 2}
+
+
+def test_is_text_file_sniffs_unknown_extensions(tmp_path):
+    text = tmp_path / "notes.log"
+    text.write_text("plain text\n")
+    binary = tmp_path / "image.dat"
+    binary.write_bytes(b"\x89PNG\x00\x00data")
+    
+    assert utils.is_text_file(str(text))
+    assert not utils.is_text_file(str(binary))
+
+
+def test_is_text_file_tolerates_character_split_at_sniff_boundary(tmp_path):
+    # A two-byte character straddling the end of the sniffed header
+    path = tmp_path / "unicode.log"
+    path.write_bytes(b"a" * (utils.TEXT_SNIFF_SIZE - 1) + "é".encode() + b"tail")
+    
+    assert utils.is_text_file(str(path))